@@ -0,0 +1,87 @@
+from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from litestar import Controller, get, post
+from litestar.params import Parameter
+from litestar.exceptions import NotFoundException, HTTPException
+
+from app.exceptions import OrderConflictError
+from app.pagination import MAX_PAGE, MAX_PAGE_SIZE
+from app.repositories.order_repository import LoadStrategy
+from app.schemas.order_schema import OrderRead, OrderSummary, OrderCreate, OrderProductsAdd
+from app.services.order_service import OrderService
+
+class OrderController(Controller):
+    path = "/orders"
+
+    @get("/{order_id:int}")
+    async def get_order_by_id(
+        self,
+        order_service: OrderService,
+        db_session: AsyncSession,
+        order_id: int = Parameter(gt=0),
+        strategy: LoadStrategy = Parameter(default="joined"),
+    ) -> OrderRead:
+        """Get order with its shipping address and products"""
+        order = await order_service.get_by_id(db_session, order_id, strategy)
+        if not order:
+            raise NotFoundException(detail=f"Order with ID {order_id} not found")
+        return order
+
+    @get("/top")
+    async def get_top_orders(
+        self,
+        order_service: OrderService,
+        db_session: AsyncSession,
+        n: int = Parameter(default=10, ge=1, le=1000),
+    ) -> List[OrderSummary]:
+        """Get the most expensive orders by their stored total"""
+        return await order_service.get_top(db_session, n)
+
+    @post()
+    async def create_order(
+        self,
+        data: OrderCreate,
+        order_service: OrderService,
+        db_session: AsyncSession,
+    ) -> OrderRead:
+        """Create an order; its total and the user's stats are updated in the same transaction"""
+        try:
+            return await order_service.create(db_session, data.user_id, data.shipping_address_id, data.product_ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    @post("/{order_id:int}/products")
+    async def add_order_products(
+        self,
+        data: OrderProductsAdd,
+        order_service: OrderService,
+        db_session: AsyncSession,
+        order_id: int = Parameter(gt=0),
+    ) -> OrderRead:
+        """Attach products to an order"""
+        try:
+            order = await order_service.add_products(db_session, order_id, data.product_ids)
+        except OrderConflictError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not order:
+            raise NotFoundException(detail=f"Order with ID {order_id} not found")
+        return order
+
+    @get()
+    async def get_all_orders(
+        self,
+        order_service: OrderService,
+        db_session: AsyncSession,
+        count: int = Parameter(default=10, ge=1, le=MAX_PAGE_SIZE),
+        page: int = Parameter(default=1, ge=1, le=MAX_PAGE),
+        user_id: int | None = Parameter(default=None, gt=0),
+        strategy: LoadStrategy = Parameter(default="selectin"),
+    ) -> List[OrderRead]:
+        """Get orders with pagination, optionally for one user.
+
+        `strategy` picks how relationships are loaded: selectin (3 queries),
+        joined (1 query) or projection (1 query, no ORM objects).
+        """
+        return await order_service.get_by_filter(db_session, count=count, page=page, strategy=strategy, user_id=user_id)
@@ -0,0 +1,22 @@
+from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from litestar import Controller, get
+from litestar.params import Parameter
+
+from app.pagination import MAX_PAGE, MAX_PAGE_SIZE
+from app.schemas.order_schema import ProductRead
+from app.services.product_service import ProductService
+
+class ProductController(Controller):
+    path = "/products"
+
+    @get()
+    async def get_all_products(
+        self,
+        product_service: ProductService,
+        db_session: AsyncSession,
+        count: int = Parameter(default=10, ge=1, le=MAX_PAGE_SIZE),
+        page: int = Parameter(default=1, ge=1, le=MAX_PAGE),
+    ) -> List[ProductRead]:
+        """Get all products with pagination"""
+        return await product_service.get_by_filter(db_session, count=count, page=page)
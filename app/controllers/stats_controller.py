@@ -0,0 +1,18 @@
+from litestar import Controller, get
+from litestar.datastructures import State
+
+
+class StatsController(Controller):
+    path = "/stats"
+
+    @get("/cache")
+    async def get_cache_stats(self, state: State) -> dict[str, int]:
+        """User cache hit/miss/eviction counters"""
+        user_cache = state.user_cache
+        return user_cache.stats() if user_cache is not None else {}
+
+    @get("/write-behind")
+    async def get_write_behind_stats(self, state: State) -> dict[str, int]:
+        """Deferred user update counters: submitted, coalesced, written, pending"""
+        user_write_behind = state.user_write_behind
+        return user_write_behind.stats() if user_write_behind is not None else {}
@@ -1,67 +1,232 @@
-from typing import List
-from litestar import Controller, get, post, put, delete
+from typing import List, Literal
+
+import msgspec
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from litestar import Controller, Response, get, post, put, patch, delete
+from litestar.response import Stream
 from litestar.di import Provide
 from litestar.params import Parameter
 from litestar.exceptions import NotFoundException, HTTPException
 
+from app.exceptions import UserAlreadyExistsError, PreconditionFailedError
+from app.export import ndjson_chunks, csv_chunks
+from app.http_cache import (
+    UNCOMPRESSED,
+    caching_headers,
+    collection_etag,
+    if_match_versions,
+    is_not_modified,
+    last_modified,
+    representation_etag,
+    user_etag,
+)
+from app.pagination import MAX_PAGE, MAX_PAGE_SIZE
+from app.repositories.user_repository import UserRepository
+from app.services.order_service import OrderService
 from app.services.user_service import UserService
-from app.schemas.user_schema import UserCreate, UserUpdate, UserResponse
+from app.schemas.user_schema import (
+    UserCreate,
+    UserUpdate,
+    UserRead,
+    UserPage,
+    UserBulkUpdate,
+    UserBulkResult,
+    UserBulkDeleteResult,
+    PENDING_USER_FIELDS,
+    parse_user_fields,
+    to_user_read,
+    user_projection,
+)
+from app.schemas.order_schema import UserOrderStatsRead
 from app.providers import provide_user_service
+from app.totals import total_headers
 
 class UserController(Controller):
     path = "/users"
 
-    @get("/{user_id:int}")
+    @get("/{user_id:int}", opt={UNCOMPRESSED: True})
     async def get_user_by_id(
         self,
         user_service: UserService,
+        db_session: AsyncSession,
         user_id: int = Parameter(gt=0),
-    ) -> UserResponse:
-        """Get user by ID"""
-        user = await user_service.get_by_id(user_id)
+        if_none_match: str | None = Parameter(header="If-None-Match", default=None),
+        if_modified_since: str | None = Parameter(header="If-Modified-Since", default=None),
+    ) -> Response[UserRead]:
+        """Get user by ID; 304 without a body if the client's ETag/Last-Modified is current"""
+        user = await user_service.get_by_id(db_session, user_id)
         if not user:
             raise NotFoundException(detail=f"User with ID {user_id} not found")
-        return UserResponse.model_validate(user)
+        etag = user_etag(user)
+        headers = caching_headers(etag, user.updated_at)
+        if is_not_modified(if_none_match, if_modified_since, etag, user.updated_at):
+            return Response(content=None, status_code=304, headers=headers)
+        return Response(content=user, headers=headers)
+
+    @get("/search")
+    async def search_users(
+        self,
+        user_service: UserService,
+        db_session: AsyncSession,
+        q: str = Parameter(max_length=100),
+        limit: int = Parameter(default=20, ge=1, le=100),
+    ) -> List[UserRead]:
+        """Substring search over username, full name and email (at least 3 characters)"""
+        try:
+            return await user_service.search(db_session, q, limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    @get("/{user_id:int}/stats")
+    async def get_user_stats(
+        self,
+        order_service: OrderService,
+        db_session: AsyncSession,
+        user_id: int = Parameter(gt=0),
+    ) -> UserOrderStatsRead:
+        """Get the user's order count and lifetime spend"""
+        stats = await order_service.get_user_stats(db_session, user_id)
+        if not stats:
+            raise NotFoundException(detail=f"User with ID {user_id} not found")
+        return stats
 
     @get()
     async def get_all_users(
         self,
         user_service: UserService,
-        count: int = Parameter(default=10, ge=1),
-        page: int = Parameter(default=1, ge=1),
-    ) -> List[UserResponse]:
-        """Get all users with pagination"""
-        users = await user_service.get_by_filter(count=count, page=page)
-        return [UserResponse.model_validate(user) for user in users]
+        db_session: AsyncSession,
+        count: int = Parameter(default=10, ge=1, le=MAX_PAGE_SIZE),
+        page: int = Parameter(default=1, ge=1, le=MAX_PAGE),
+        cursor: str | None = Parameter(default=None),
+        include_total: bool = Parameter(default=False),
+        fields: str | None = Parameter(default=None, max_length=200),
+        if_none_match: str | None = Parameter(header="If-None-Match", default=None),
+        if_modified_since: str | None = Parameter(header="If-Modified-Since", default=None),
+    ) -> Response[List[UserRead] | UserPage]:
+        """Get all users with pagination.
+
+        Without `cursor` pages by `page`/`count` (OFFSET). Passing `cursor`
+        (empty for the first page) switches to keyset pagination on `id`
+        and returns the page together with `next_cursor`. The page carries a
+        weak ETag over its users' versions and answers 304 like GET /users/{id}.
+
+        `fields=id,username` returns only those fields (plus `id`) and selects
+        only their columns; such a page's ETag is a hash of its body.
+
+        `include_total=true` adds X-Total-Count. It is exact (X-Total-Count-Exact:
+        true) for a small table; for a large one it is cached, X-Total-Count-Age
+        seconds old (at most twice USER_COUNT_MAX_AGE), or an estimate from
+        planner statistics with no age header.
+        """
+        try:
+            selected = parse_user_fields(fields)
+            if cursor is not None:
+                users, next_cursor = await user_service.get_page(
+                    db_session, count=count, cursor=cursor, fields=selected
+                )
+                content = UserPage(items=users, next_cursor=next_cursor)
+                etag_parts = (next_cursor,)
+            else:
+                users = content = await user_service.get_by_filter(db_session, count=count, page=page, fields=selected)
+                etag_parts = ()
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if selected is None:
+            etag = collection_etag(users, *etag_parts)
+            # Удалённый пользователь меняет состав страницы, а не max(updated_at) — для
+            # списков полагаемся только на ETag
+            modified = last_modified(users)
+        else:
+            # У урезанных элементов может не быть version и updated_at: кодируем тело один раз
+            # сами и берём ETag от него; в ответ уходят уже готовые байты
+            content = msgspec.json.encode(content)
+            etag = representation_etag(content)
+            modified = None
+        headers = caching_headers(etag, modified)
+        if include_total:
+            headers.update(total_headers(await user_service.get_total(db_session)))
+        if is_not_modified(if_none_match, None, etag, modified):
+            return Response(content=None, status_code=304, headers=headers)
+        return Response(content=content, headers=headers)
+
+    @get("/export")
+    async def export_users(
+        self,
+        session_factory: async_sessionmaker,
+        export_format: Literal["ndjson", "csv"] = Parameter(query="format", default="ndjson"),
+    ) -> Stream:
+        """Stream the whole users table as NDJSON or CSV"""
+
+        async def rows():
+            # Сессия запроса закрывается до отправки тела, поэтому открываем свою
+            async with session_factory() as session:
+                async for row in UserRepository().stream_rows(session):
+                    yield row
+
+        columns = UserRepository.EXPORT_COLUMNS
+        if export_format == "csv":
+            return Stream(
+                csv_chunks(columns, rows()),
+                media_type="text/csv",
+                headers={"Content-Disposition": 'attachment; filename="users.csv"'},
+            )
+        return Stream(ndjson_chunks(columns, rows()), media_type="application/x-ndjson")
 
     @post()
     async def create_user(
         self,
         user_service: UserService,
+        db_session: AsyncSession,
         data: UserCreate,
-    ) -> UserResponse:
+    ) -> UserRead:
         """Create a new user"""
         try:
-            user = await user_service.create(data)
-            return UserResponse.model_validate(user)
+            user = await user_service.create(db_session, data)
+            return to_user_read(user)
+        except UserAlreadyExistsError as e:
+            raise HTTPException(status_code=409, detail=str(e))
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error creating user: {str(e)}")
 
-    @put("/{user_id:int}")
+    @put("/{user_id:int}", opt={UNCOMPRESSED: True})
     async def update_user(
         self,
         user_service: UserService,
+        db_session: AsyncSession,
         user_id: int,
         data: UserUpdate,
-    ) -> UserResponse:
-        """Update an existing user"""
+        if_match: str | None = Parameter(header="If-Match", default=None),
+    ) -> Response[UserRead]:
+        """Update an existing user; with If-Match only if its ETag is still current (else 412).
+
+        In write-behind mode a full_name-only change is answered with 202 and
+        the expected user before it is written: no ETag, and no `version` or
+        `updated_at`, which the write has yet to assign. The response still
+        sets the read-your-writes cookie when replicas are configured.
+        """
         try:
-            user = await user_service.update(user_id, data)
+            expected_versions = if_match_versions(if_match, user_id)
+            if expected_versions == []:
+                raise PreconditionFailedError()
+            deferred = user_service.defers(data, expected_versions)
+            user = await user_service.update(db_session, user_id, data, expected_versions)
             if not user:
                 raise NotFoundException(detail=f"User with ID {user_id} not found")
-            return UserResponse.model_validate(user)
+            if deferred:
+                pending = user_projection(PENDING_USER_FIELDS)
+                return Response(
+                    content=pending(*(getattr(user, name) for name in PENDING_USER_FIELDS)), status_code=202
+                )
+            return Response(content=to_user_read(user), headers={"ETag": user_etag(user)})
+        except HTTPException:
+            raise
+        except PreconditionFailedError as e:
+            raise HTTPException(status_code=412, detail=str(e))
+        except UserAlreadyExistsError as e:
+            raise HTTPException(status_code=409, detail=str(e))
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
@@ -71,7 +236,61 @@ class UserController(Controller):
     async def delete_user(
         self,
         user_service: UserService,
+        db_session: AsyncSession,
         user_id: int,
+        if_match: str | None = Parameter(header="If-Match", default=None),
     ) -> None:
-        """Delete a user"""
-        await user_service.delete(user_id)
\ No newline at end of file
+        """Delete a user; with If-Match only if its ETag is still current (else 412)"""
+        expected_versions = if_match_versions(if_match, user_id)
+        try:
+            if expected_versions == []:
+                raise PreconditionFailedError()
+            await user_service.delete(db_session, user_id, expected_versions)
+        except PreconditionFailedError as e:
+            raise HTTPException(status_code=412, detail=str(e))
+
+    @post("/bulk")
+    async def bulk_create_users(
+        self,
+        user_service: UserService,
+        db_session: AsyncSession,
+        data: list[UserCreate],
+    ) -> UserBulkResult:
+        """Create many users in one transaction"""
+        try:
+            users, errors = await user_service.bulk_create(db_session, data)
+        except UserAlreadyExistsError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return UserBulkResult(items=[to_user_read(user) for user in users], errors=errors)
+
+    @patch("/bulk")
+    async def bulk_update_users(
+        self,
+        user_service: UserService,
+        db_session: AsyncSession,
+        data: list[UserBulkUpdate],
+    ) -> UserBulkResult:
+        """Partially update many users in one transaction"""
+        try:
+            users, errors = await user_service.bulk_update(db_session, data)
+        except UserAlreadyExistsError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return UserBulkResult(items=[to_user_read(user) for user in users], errors=errors)
+
+    @delete("/bulk", status_code=200)
+    async def bulk_delete_users(
+        self,
+        user_service: UserService,
+        db_session: AsyncSession,
+        data: list[int],
+    ) -> UserBulkDeleteResult:
+        """Delete many users by ID in one statement"""
+        try:
+            deleted, errors = await user_service.bulk_delete(db_session, data)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return UserBulkDeleteResult(deleted=deleted, errors=errors)
@@ -0,0 +1,75 @@
+from typing import Any
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.settings import Settings
+
+_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def engine_options(settings: Settings) -> dict[str, Any]:
+    """Keyword arguments shared by the async and sync engines"""
+    options: dict[str, Any] = {
+        "echo": settings.echo,
+        "pool_pre_ping": settings.pool_pre_ping,
+    }
+    # SQLite :memory: работает на StaticPool, размеры пула к нему не применимы
+    if not settings.is_sqlite_memory:
+        options.update(
+            pool_size=settings.pool_size,
+            max_overflow=settings.max_overflow,
+            pool_timeout=settings.pool_timeout,
+            pool_recycle=settings.pool_recycle,
+        )
+    return options
+
+
+def _merge_options(settings: Settings, overrides: dict[str, Any]) -> dict[str, Any]:
+    options = {**engine_options(settings), **overrides}
+    # NullPool/StaticPool не принимают параметров размера пула
+    if options.get("poolclass") is not None:
+        for key in ("pool_size", "max_overflow", "pool_timeout"):
+            options.pop(key, None)
+    return options
+
+
+def install_sqlite_pragmas(engine: Engine, settings: Settings) -> None:
+    """Run the configured PRAGMAs on every new SQLite connection"""
+    journal_mode = settings.sqlite_journal_mode.upper()
+    synchronous = settings.sqlite_synchronous.upper()
+    if journal_mode not in _JOURNAL_MODES:
+        raise ValueError(f"Unsupported SQLite journal_mode: {settings.sqlite_journal_mode}")
+    if synchronous not in _SYNCHRONOUS_MODES:
+        raise ValueError(f"Unsupported SQLite synchronous mode: {settings.sqlite_synchronous}")
+
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}",
+        f"PRAGMA synchronous = {synchronous}",
+        f"PRAGMA mmap_size = {int(settings.sqlite_mmap_size)}",
+    ]
+    if not settings.is_sqlite_memory:
+        pragmas.insert(0, f"PRAGMA journal_mode = {journal_mode}")
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def create_async_engine_from_settings(settings: Settings, **overrides: Any) -> AsyncEngine:
+    engine = create_async_engine(settings.database_url, **_merge_options(settings, overrides))
+    if settings.is_sqlite:
+        install_sqlite_pragmas(engine.sync_engine, settings)
+    return engine
+
+
+def create_sync_engine_from_settings(settings: Settings, **overrides: Any) -> Engine:
+    engine = create_engine(settings.sync_database_url, **_merge_options(settings, overrides))
+    if settings.is_sqlite:
+        install_sqlite_pragmas(engine, settings)
+    return engine
@@ -0,0 +1,19 @@
+class UserAlreadyExistsError(ValueError):
+    """Raised when a username or email violates a unique constraint"""
+
+    def __init__(self, detail: str = "User with this username or email already exists"):
+        super().__init__(detail)
+
+
+class OrderConflictError(ValueError):
+    """Raised when a concurrent request changed the same order first"""
+
+    def __init__(self, detail: str = "Order was modified by another request"):
+        super().__init__(detail)
+
+
+class PreconditionFailedError(ValueError):
+    """Raised when an If-Match version no longer matches the stored row"""
+
+    def __init__(self, detail: str = "User was modified by another request"):
+        super().__init__(detail)
@@ -0,0 +1,44 @@
+import csv
+import io
+from typing import AsyncIterator, Sequence
+
+import msgspec
+
+# Сколько строк склеивать в один chunk ответа
+ROWS_PER_CHUNK = 1000
+
+
+async def ndjson_chunks(columns: Sequence[str], rows: AsyncIterator[tuple]) -> AsyncIterator[bytes]:
+    """Encode rows as newline-delimited JSON objects"""
+    encoder = msgspec.json.Encoder()
+    buffer = bytearray()
+    count = 0
+    async for row in rows:
+        # encode_into дописывает прямо в буфер, без промежуточного bytes на строку
+        encoder.encode_into(dict(zip(columns, row)), buffer, -1)
+        buffer += b"\n"
+        count += 1
+        if count == ROWS_PER_CHUNK:
+            yield bytes(buffer)
+            buffer.clear()
+            count = 0
+    if buffer:
+        yield bytes(buffer)
+
+
+async def csv_chunks(columns: Sequence[str], rows: AsyncIterator[tuple]) -> AsyncIterator[bytes]:
+    """Encode rows as CSV with a header line"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    count = 0
+    async for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count == ROWS_PER_CHUNK:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode()
@@ -0,0 +1,119 @@
+"""Validators for conditional requests on user resources.
+
+A user's ETag is its row version (`"<id>-<version>"`, strong); a list gets a
+weak ETag hashed from the (id, version) pairs of its items, or from the
+encoded body when its items are narrowed to fields without `version`.
+Last-Modified is the newest `updated_at`.
+
+A strong ETag promises byte-identical bodies, so handlers that send one
+are marked with the `UNCOMPRESSED` opt key and skipped by compression.
+"""
+import hashlib
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable
+
+from app.models.user import User
+from app.schemas.user_schema import UserRead
+
+_ETAG = re.compile(r'\s*(W/)?("[^"]*")\s*(?:,|$)')
+
+# opt-ключ обработчика (CompressionConfig.exclude_opt_key): сжатый ответ отличался бы байтами при том же ETag
+UNCOMPRESSED = "uncompressed"
+
+
+def user_etag(user: UserRead | User) -> str:
+    return f'"{user.id}-{user.version}"'
+
+
+def collection_etag(users: Iterable[UserRead], *parts: object) -> str:
+    """Weak ETag of a list; `parts` mix in anything else the body depends on (e.g. next_cursor)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for user in users:
+        digest.update(b"%d:%d," % (user.id, user.version))
+    for part in parts:
+        digest.update(repr(part).encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def representation_etag(body: bytes) -> str:
+    """Weak ETag hashed from an encoded body, for lists whose items carry no version (sparse fieldsets)"""
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def http_date(value: datetime) -> str:
+    # updated_at хранится как наивное UTC-время (CURRENT_TIMESTAMP)
+    return format_datetime(value.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def last_modified(users: Iterable[UserRead]) -> datetime | None:
+    return max((user.updated_at for user in users), default=None)
+
+
+def _parse_etags(header: str) -> list[tuple[bool, str]]:
+    return [(bool(weak), tag) for weak, tag in _ETAG.findall(header)]
+
+
+def none_match(if_none_match: str | None, etag: str) -> bool:
+    """True if If-None-Match lists `etag` (weak comparison) or is "*": the client's copy is current"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag == opaque for _, tag in _parse_etags(if_none_match))
+
+
+def not_modified_since(if_modified_since: str | None, modified: datetime | None) -> bool:
+    """True if the resource has not changed since If-Modified-Since (whole seconds, as HTTP dates are)"""
+    if not if_modified_since or modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+
+def is_not_modified(if_none_match: str | None, if_modified_since: str | None, etag: str, modified: datetime | None) -> bool:
+    # If-None-Match важнее If-Modified-Since (RFC 9110, 13.2.2)
+    if if_none_match:
+        return none_match(if_none_match, etag)
+    return not_modified_since(if_modified_since, modified)
+
+
+class _AnyVersion:
+    def __repr__(self) -> str:
+        return "ANY_VERSION"
+
+
+# If-Match: * — подходит любая версия, но пользователь должен существовать (RFC 9110, 13.1.1)
+ANY_VERSION = _AnyVersion()
+
+
+def if_match_versions(if_match: str | None, user_id: int) -> list[int] | _AnyVersion | None:
+    """Versions of `user_id` named by If-Match (strong comparison).
+
+    None means unconditional (no header); ANY_VERSION ("*") matches any
+    existing row; an empty list means no tag can match, so the precondition fails.
+    """
+    if not if_match:
+        return None
+    if if_match.strip() == "*":
+        return ANY_VERSION
+    prefix = f'"{user_id}-'
+    versions = []
+    for weak, tag in _parse_etags(if_match):
+        if not weak and tag.startswith(prefix) and tag[len(prefix):-1].isdigit():
+            versions.append(int(tag[len(prefix):-1]))
+    return versions
+
+
+def caching_headers(etag: str, modified: datetime | None) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if modified is not None:
+        headers["Last-Modified"] = http_date(modified)
+    return headers
@@ -0,0 +1,290 @@
+"""Bulk loading: stream records from JSON/JSONL and insert them in batches.
+
+Records are read lazily (a JSON array is decoded element by element), grouped
+into batches and written with Core executemany inside one transaction. On
+SQLite the durability PRAGMAs are relaxed for the duration of the load: a
+crash mid-import rolls the whole transaction back anyway.
+
+Usage:
+    python -m app.importer tasks parsed_tasks.json [--truncate]
+    python -m app.importer synthetic --users 1000000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass
+from itertools import chain, islice
+from typing import AsyncContextManager, AsyncIterator, Callable, Iterable, Iterator, Sequence, TextIO
+
+from sqlalchemy import Table, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.models.order import Address, Order, Product, UserOrderStats, order_products
+from app.models.task import Task
+from app.models.user import User
+from app.search import deferred_search_index
+
+BATCH_SIZE = 5000
+READ_CHUNK = 64 * 1024
+
+# Durability не нужна: вся загрузка — одна транзакция, при сбое она откатится
+_BULK_PRAGMAS = {
+    "synchronous": "OFF",
+    "cache_size": -256 * 1024,  # KiB
+    "temp_store": "MEMORY",
+}
+
+
+@dataclass
+class ImportStats:
+    table: str
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.table}: {self.rows} rows in {self.seconds:.2f}s ({self.rows_per_second:,.0f} rows/s)"
+
+
+def iter_json_records(path: str) -> Iterator[dict]:
+    """Yield records from a JSON array or a JSON Lines file without loading it whole"""
+    with open(path, encoding="utf-8") as file:
+        head = file.read(1)
+        while head and head.isspace():
+            head = file.read(1)
+        if head == "[":
+            yield from _iter_json_array(file)
+        elif head:
+            for line in chain([head + file.readline()], file):
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def _iter_json_array(file: TextIO) -> Iterator[dict]:
+    """Decode the elements of a JSON array one at a time; `file` is positioned after '['"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    while True:
+        # Пропускаем пробелы и запятые между элементами
+        while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ","):
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            if pos == len(buffer):
+                raise json.JSONDecodeError("Need more data", buffer, pos)
+            record, end = decoder.raw_decode(buffer, pos)
+            # Элемент, упёршийся в конец буфера, мог быть обрезан (например, число)
+            if end == len(buffer) and not eof:
+                raise json.JSONDecodeError("Need more data", buffer, end)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = file.read(READ_CHUNK)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        yield record
+        pos = end
+
+
+def _batches(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+@asynccontextmanager
+async def advance_id_sequences(conn: AsyncConnection, tables: Sequence[Table]) -> AsyncIterator[None]:
+    """After a load with explicit ids, move each table's id sequence past its largest id (PostgreSQL)"""
+    yield
+    # SQLite сам продолжает с max(rowid) + 1, а последовательность PostgreSQL о вставленных id не знает
+    if conn.dialect.name != "postgresql":
+        return
+    for table in tables:
+        await conn.execute(select(func.setval(
+            func.pg_get_serial_sequence(table.name, "id"),
+            select(func.max(table.c.id)).scalar_subquery(),
+        )))
+
+
+@asynccontextmanager
+async def relaxed_sqlite_pragmas(conn: AsyncConnection) -> AsyncIterator[None]:
+    """Switch off fsync and enlarge the page cache for a bulk load, then restore the previous values"""
+    if conn.dialect.name != "sqlite":
+        yield
+        return
+    saved = {}
+    for name, value in _BULK_PRAGMAS.items():
+        saved[name] = (await conn.exec_driver_sql(f"PRAGMA {name}")).scalar()
+        await conn.exec_driver_sql(f"PRAGMA {name} = {value}")
+    await conn.commit()
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            await conn.exec_driver_sql(f"PRAGMA {name} = {value}")
+        await conn.commit()
+
+
+async def bulk_load(
+    engine: AsyncEngine,
+    sources: Iterable[tuple[Table, Iterable[dict]]],
+    batch_size: int = BATCH_SIZE,
+    truncate: bool = False,
+    hooks: Sequence[Callable[[AsyncConnection], AsyncContextManager]] = (),
+) -> list[ImportStats]:
+    """Insert every (table, rows) source in order, all in a single transaction.
+
+    `hooks` are context managers entered inside the transaction around the load.
+    """
+    stats = []
+    async with engine.connect() as conn:
+        async with relaxed_sqlite_pragmas(conn):
+            async with conn.begin(), AsyncExitStack() as stack:
+                for hook in hooks:
+                    await stack.enter_async_context(hook(conn))
+                for table, rows in sources:
+                    started = time.perf_counter()
+                    if truncate:
+                        await conn.execute(delete(table))
+                    count = 0
+                    for batch in _batches(rows, batch_size):
+                        await conn.execute(insert(table), batch)
+                        count += len(batch)
+                    stats.append(ImportStats(table.name, count, time.perf_counter() - started))
+    return stats
+
+
+def task_rows(records: Iterable[dict]) -> Iterator[dict]:
+    """Map parsed_tasks.json records onto the tasks table"""
+    for record in records:
+        yield {
+            "type": record["type"],
+            "text": record["text"],
+            "themes": record.get("themes") or [],
+            "variants": record.get("variants") or [],
+            "accordance": record.get("accordance") or {},
+            "images": record.get("images") or [],
+        }
+
+
+async def import_tasks(engine: AsyncEngine, path: str, batch_size: int = BATCH_SIZE, truncate: bool = False) -> ImportStats:
+    stats = await bulk_load(
+        engine, [(Task.__table__, task_rows(iter_json_records(path)))], batch_size, truncate=truncate
+    )
+    return stats[0]
+
+
+def _product_price(product_id: int) -> int:
+    return product_id * 37 % 10_000 + 100
+
+
+def _order_product_ids(user_index: int, first_product: int, products: int) -> list[int]:
+    """Deterministic 1..3 distinct products per order, so orders, links and totals agree"""
+    count = min(user_index % 3 + 1, products)
+    return [first_product + (user_index * 7 + k) % products for k in range(count)]
+
+
+async def seed_synthetic(
+    engine: AsyncEngine, users: int, products: int = 1000, batch_size: int = BATCH_SIZE
+) -> list[ImportStats]:
+    """Append `users` users, each with one address and one order, plus `products` products"""
+    if products < 1:
+        raise ValueError("At least one product is needed for the generated orders")
+    async with engine.connect() as conn:
+        first_user, first_address, first_order, first_product = [
+            (await conn.execute(select(func.coalesce(func.max(column), 0)))).scalar() + 1
+            for column in (User.id, Address.id, Order.id, Product.id)
+        ]
+
+    # Заказы ссылаются только на сгенерированные товары, чтобы цены были известны заранее
+    def order_items(i: int) -> list[int]:
+        return _order_product_ids(i, first_product, products)
+
+    sources = [
+        (Product.__table__, (
+            {"id": first_product + i, "title": f"Synthetic product {first_product + i}",
+             "price_cents": _product_price(first_product + i)}
+            for i in range(products)
+        )),
+        (User.__table__, (
+            {"id": first_user + i, "username": f"synthetic{first_user + i}",
+             "email": f"synthetic{first_user + i}@example.com", "full_name": f"Synthetic User {first_user + i}"}
+            for i in range(users)
+        )),
+        (Address.__table__, (
+            {"id": first_address + i, "user_id": first_user + i, "city": f"City {i % 1000}",
+             "street": f"Street {i}"}
+            for i in range(users)
+        )),
+        (Order.__table__, (
+            {"id": first_order + i, "user_id": first_user + i, "shipping_address_id": first_address + i,
+             "total_cents": sum(_product_price(p) for p in order_items(i))}
+            for i in range(users)
+        )),
+        (order_products, (
+            {"order_id": first_order + i, "product_id": product_id}
+            for i in range(users)
+            for product_id in order_items(i)
+        )),
+        (UserOrderStats.__table__, (
+            {"user_id": first_user + i, "order_count": 1,
+             "total_spent_cents": sum(_product_price(p) for p in order_items(i))}
+            for i in range(users)
+        )),
+    ]
+    # Поисковый индекс пополняется одним INSERT ... SELECT после загрузки, а не триггером на каждую строку
+    hooks = [
+        lambda conn: deferred_search_index(conn, first_user),
+        lambda conn: advance_id_sequences(
+            conn, [Product.__table__, User.__table__, Address.__table__, Order.__table__]
+        ),
+    ]
+    return await bulk_load(engine, sources, batch_size, hooks=hooks)
+
+
+async def main(argv: list[str] | None = None) -> None:
+    from app.database import create_async_engine_from_settings
+    from app.settings import get_settings
+
+    parser = argparse.ArgumentParser(prog="python -m app.importer", description=__doc__.split("\n")[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    tasks = subparsers.add_parser("tasks", help="import tasks from a JSON array or JSONL file")
+    tasks.add_argument("path")
+    tasks.add_argument("--truncate", action="store_true", help="delete existing tasks in the same transaction")
+    synthetic = subparsers.add_parser("synthetic", help="generate users, addresses, orders and products")
+    synthetic.add_argument("--users", type=int, default=1_000_000)
+    synthetic.add_argument("--products", type=int, default=1000)
+    for subparser in (tasks, synthetic):
+        subparser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    engine = create_async_engine_from_settings(get_settings())
+    started = time.perf_counter()
+    try:
+        if args.command == "tasks":
+            stats = [await import_tasks(engine, args.path, args.batch_size, args.truncate)]
+        else:
+            stats = await seed_synthetic(engine, args.users, args.products, args.batch_size)
+    finally:
+        await engine.dispose()
+
+    for item in stats:
+        print(item)
+    # Общее время включает коммит и построение поискового индекса
+    print(ImportStats("total", sum(item.rows for item in stats), time.perf_counter() - started))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
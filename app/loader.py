@@ -0,0 +1,85 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchFn = Callable[[list[K]], Awaitable[dict[K, V]]]
+
+
+class DataLoader(Generic[K, V]):
+    """Coalesces concurrent single-key loads into one batched call.
+
+    `load` calls made within one tick (`delay` seconds; 0 means the current
+    event loop iteration) are collected and resolved by a single
+    `batch_fn(keys)`, which returns a mapping of the keys it found. Keys
+    that are already being loaded share the in-flight future. Nothing is
+    cached once a batch resolves; caching is the repository's job.
+    """
+
+    def __init__(self, batch_fn: BatchFn, max_batch_size: int = 500, delay: float = 0.0):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.delay = delay
+        self._pending: dict[K, asyncio.Future] = {}
+        self._in_flight: dict[K, asyncio.Future] = {}
+        self._dispatch_handle: asyncio.Handle | None = None
+        # Ссылки на задачи батчей, чтобы их не собрал GC до завершения
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.loads = 0
+
+    async def load(self, key: K) -> V | None:
+        self.loads += 1
+        future = self._pending.get(key) or self._in_flight.get(key)
+        if future is None:
+            future = self._enqueue(key)
+        # shield: отмена одного запроса не должна отменять общий future остальных
+        return await asyncio.shield(future)
+
+    def _enqueue(self, key: K) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = self._pending[key] = loop.create_future()
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._dispatch_handle is None:
+            if self.delay > 0:
+                self._dispatch_handle = loop.call_later(self.delay, self._dispatch)
+            else:
+                self._dispatch_handle = loop.call_soon(self._dispatch)
+        return future
+
+    def _dispatch(self) -> None:
+        if self._dispatch_handle is not None:
+            self._dispatch_handle.cancel()
+            self._dispatch_handle = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            self._in_flight.update(batch)
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[K, asyncio.Future]) -> None:
+        self.batches += 1
+        try:
+            values = await self.batch_fn(list(batch))
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(values.get(key))
+        finally:
+            for key, future in batch.items():
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+
+    def stats(self) -> dict[str, int]:
+        return {"loads": self.loads, "batches": self.batches}
@@ -1,28 +1,208 @@
-import os
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from functools import partial
+from typing import AsyncIterator
+
 from litestar import Litestar
+from litestar.config.compression import CompressionConfig
+from litestar.datastructures import State
 from litestar.di import Provide
+from litestar.middleware import DefineMiddleware
 
+from app.cache import LRUCache
+from app.loader import DataLoader
+from app.controllers.order_controller import OrderController
+from app.controllers.product_controller import ProductController
+from app.controllers.stats_controller import StatsController
 from app.controllers.user_controller import UserController
-from app.providers import provide_db_session, provide_user_repository, provide_user_service
+from app.database import create_async_engine_from_settings
+from app.http_cache import UNCOMPRESSED
+from app.metrics import MetricsPlugin, MetricsRegistry, install_sql_instrumentation
+from app.providers import (
+    count_users,
+    estimate_users,
+    flush_user_updates,
+    load_users,
+    make_user_repository,
+    provide_db_session,
+    provide_order_service,
+    provide_product_service,
+    provide_session_factory,
+    provide_user_service,
+)
+from app.repositories.order_repository import OrderRepository
+from app.repositories.product_repository import ProductRepository
+from app.replicas import ReplicaSet, make_session_factory, read_your_writes_middleware
+from app.services.order_service import OrderService
+from app.services.product_service import ProductService
+from app.services.user_service import UserService
+from app.settings import Settings, get_settings
+from app.totals import CachedTotal
+from app.write_behind import WriteBehindQueue
 
-# Database configuration
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///mydb.sqlite3")
+# Поля stats(), которые только растут (плюс replica<N>_picks): на /metrics это counter с суффиксом _total
+COUNTER_STATS = frozenset({
+    "hits", "misses", "evictions", "expirations",  # LRUCache
+    "loads", "batches",  # DataLoader, WriteBehindQueue
+    "submitted", "coalesced", "written", "dropped",  # WriteBehindQueue
+    "counts", "cached", "estimated",  # CachedTotal
+})
 
-engine = create_async_engine(DATABASE_URL, echo=True)
-async_session_factory = async_sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
 
-app = Litestar(
-    route_handlers=[UserController],
-    dependencies={
-        "db_session": Provide(provide_db_session),
-        "user_repository": Provide(provide_user_repository),
-        "user_service": Provide(provide_user_service),
-    },
-)
+def create_app(settings: Settings | None = None) -> Litestar:
+    """Build the application; the engine and per-process state are created in its lifespan.
+
+    Nothing touches the database at import time, so every worker process
+    (see app/serve.py) opens its own connection pool after it has started.
+    """
+    settings = settings or get_settings()
+    # Метрики по маршрутам на GET /metrics; METRICS_ENABLED=1 включает их
+    metrics_registry = MetricsRegistry()
+
+    @asynccontextmanager
+    async def lifespan(app: Litestar) -> AsyncIterator[None]:
+        engine = create_async_engine_from_settings(settings)
+        replica_engines = [
+            create_async_engine_from_settings(replace(settings, database_url=url))
+            for url in settings.database_replica_urls
+        ]
+        replicas = ReplicaSet(replica_engines, settings.replica_policy) if replica_engines else None
+        if settings.metrics_enabled:
+            for each in (engine, *replica_engines):
+                install_sql_instrumentation(each.sync_engine)
+        session_factory = make_session_factory(engine, replicas)
+
+        # Read-through cache for GET /users/{id}; USER_CACHE_SIZE=0 disables it
+        user_cache = (
+            LRUCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl)
+            if settings.user_cache_size > 0
+            else None
+        )
+
+        user_repository = make_user_repository(user_cache)
+
+        # Сливает конкурентные чтения пользователей по id в один запрос; USER_LOADER_MAX_BATCH=0 отключает
+        user_loader = (
+            DataLoader(
+                partial(load_users, session_factory, user_repository),
+                max_batch_size=settings.user_loader_max_batch,
+                delay=settings.user_loader_delay_ms / 1000,
+            )
+            if settings.user_loader_max_batch > 0
+            else None
+        )
+
+        # Пачечная запись частых обновлений профиля; USER_WRITE_BEHIND_MAX_BATCH=0 отключает
+        user_write_behind = (
+            WriteBehindQueue(
+                partial(flush_user_updates, session_factory, user_repository),
+                max_batch_size=settings.user_write_behind_max_batch,
+                interval=settings.user_write_behind_interval_ms / 1000,
+                max_pending=settings.user_write_behind_max_pending,
+            )
+            if settings.user_write_behind_max_batch > 0
+            else None
+        )
+
+        user_total = CachedTotal(
+            partial(count_users, session_factory, user_repository),
+            partial(estimate_users, session_factory, user_repository),
+            exact_threshold=settings.user_count_exact_threshold,
+            max_age=settings.user_count_max_age,
+        )
+
+        app.state.update(
+            engine=engine,
+            replicas=replicas,
+            session_factory=session_factory,
+            user_cache=user_cache,
+            user_loader=user_loader,
+            user_write_behind=user_write_behind,
+            user_total=user_total,
+            user_service=UserService(user_repository, user_loader, user_write_behind, user_total),
+            order_service=OrderService(OrderRepository()),
+            product_service=ProductService(ProductRepository()),
+        )
+        if user_write_behind is not None:
+            user_write_behind.start()
+        try:
+            yield
+        finally:
+            # Сначала дописываем принятые обновления, потом закрываем пулы
+            if user_write_behind is not None:
+                await user_write_behind.close()
+            await user_total.close()
+            for each in (engine, *replica_engines):
+                await each.dispose()
+
+    def cache_gauges() -> dict[str, float]:
+        gauges = {}
+
+        def add(prefix: str, stats: dict[str, float]) -> None:
+            gauges.update({
+                f"{prefix}{name}_total" if name in COUNTER_STATS or name.endswith("_picks") else f"{prefix}{name}": value
+                for name, value in stats.items()
+            })
+
+        user_cache = app.state.get("user_cache")
+        user_loader = app.state.get("user_loader")
+        user_write_behind = app.state.get("user_write_behind")
+        user_total = app.state.get("user_total")
+        replicas = app.state.get("replicas")
+        if user_cache is not None:
+            add("app_user_cache_", user_cache.stats())
+        if user_loader is not None:
+            add("app_user_loader_", user_loader.stats())
+        if user_write_behind is not None:
+            add("app_user_write_behind_", user_write_behind.stats())
+        if user_total is not None:
+            add("app_user_total_", user_total.stats())
+        if replicas is not None:
+            add("app_db_", replicas.stats())
+        return gauges
+
+    plugins = [MetricsPlugin(metrics_registry, gauges=cache_gauges)] if settings.metrics_enabled else []
+    # Cookie read-your-writes нужна только при наличии реплик
+    middleware = (
+        [DefineMiddleware(read_your_writes_middleware, window=settings.read_your_writes_seconds)]
+        if settings.database_replica_urls
+        else []
+    )
+
+    # brotli отвечает gzip клиентам без его поддержки; без пакета brotli приложение не стартует
+    compression_config = (
+        CompressionConfig(
+            backend=settings.response_compression,
+            minimum_size=settings.compression_minimum_size,
+            gzip_compress_level=settings.gzip_compress_level,
+            brotli_quality=settings.brotli_quality,
+            exclude_opt_key=UNCOMPRESSED,
+        )
+        if settings.response_compression != "off"
+        else None
+    )
+
+    app = Litestar(
+        route_handlers=[UserController, OrderController, ProductController, StatsController],
+        plugins=plugins,
+        middleware=middleware,
+        compression_config=compression_config,
+        lifespan=[lifespan],
+        state=State({"settings": settings}),
+        dependencies={
+            "db_session": Provide(provide_db_session),
+            "session_factory": Provide(provide_session_factory, sync_to_thread=False),
+            "user_service": Provide(provide_user_service, sync_to_thread=False),
+            "order_service": Provide(provide_order_service, sync_to_thread=False),
+            "product_service": Provide(provide_product_service, sync_to_thread=False),
+        },
+    )
+    return app
+
+
+# Для `uvicorn app.main:app` и in-process бенчмарков; несколько воркеров — python -m app.serve
+app = create_app()
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    from app.serve import main
+    main()
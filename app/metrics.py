@@ -0,0 +1,283 @@
+import inspect
+from bisect import bisect_left
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, Iterable
+
+from litestar import MediaType, Response, get
+from litestar.config.app import AppConfig
+from litestar.di import Provide
+from litestar.middleware import DefineMiddleware
+from litestar.plugins import InitPluginProtocol
+from litestar.types import ASGIApp, Receive, Scope, Send
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Cumulative Prometheus-style histogram"""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> Iterable[str]:
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f"{name}_sum{{{labels}}} {self.sum}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+@dataclass
+class RequestMetrics:
+    """Timings collected while a single request is being handled"""
+
+    started: float
+    statements: int = 0
+    db_seconds: float = 0.0
+    di_seconds: float = 0.0
+    handler_done: float | None = None
+    response_started: float | None = None
+
+
+_current_request: ContextVar[RequestMetrics | None] = ContextVar("current_request_metrics", default=None)
+
+
+def current_request_metrics() -> RequestMetrics | None:
+    return _current_request.get()
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_seconds = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.di_seconds = 0.0
+        self.serialization_seconds = 0.0
+        self.responses: dict[int, int] = {}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Per-route request metrics rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self.routes: dict[tuple[str, str], RouteMetrics] = {}
+
+    def observe(self, method: str, route: str, status: int, request: RequestMetrics, finished: float) -> None:
+        metrics = self.routes.get((method, route))
+        if metrics is None:
+            metrics = self.routes[(method, route)] = RouteMetrics()
+        metrics.latency.observe(finished - request.started)
+        metrics.db_seconds.observe(request.db_seconds)
+        metrics.statements.observe(request.statements)
+        metrics.di_seconds += request.di_seconds
+        if request.handler_done is not None and request.response_started is not None:
+            metrics.serialization_seconds += max(request.response_started - request.handler_done, 0.0)
+        metrics.responses[status] = metrics.responses.get(status, 0) + 1
+
+    def render(self, gauges: dict[str, float] | None = None) -> str:
+        histograms = (
+            ("app_http_request_duration_seconds", "Request latency", "latency"),
+            ("app_http_request_db_seconds", "Time spent executing SQL per request", "db_seconds"),
+            ("app_http_request_db_statements", "SQL statements executed per request", "statements"),
+        )
+        lines = []
+        for name, help_text, attr in histograms:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (method, route), metrics in self.routes.items():
+                labels = f'method="{method}",route="{_escape(route)}"'
+                lines.extend(getattr(metrics, attr).render(name, labels))
+
+        counters = (
+            ("app_http_request_di_seconds_total", "Time spent resolving dependencies", "di_seconds"),
+            ("app_http_response_serialization_seconds_total", "Time spent building the response body", "serialization_seconds"),
+        )
+        for name, help_text, attr in counters:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for (method, route), metrics in self.routes.items():
+                lines.append(f'{name}{{method="{method}",route="{_escape(route)}"}} {getattr(metrics, attr)}')
+
+        lines += ["# HELP app_http_responses_total Responses by status code", "# TYPE app_http_responses_total counter"]
+        for (method, route), metrics in self.routes.items():
+            for status, count in sorted(metrics.responses.items()):
+                lines.append(
+                    f'app_http_responses_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}'
+                )
+
+        # Значения stats() компонентов; монотонные приходят с суффиксом _total и отдаются как counter
+        for name, value in (gauges or {}).items():
+            lines += [f"# TYPE {name} {'counter' if name.endswith('_total') else 'gauge'}", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+def install_sql_instrumentation(engine: Engine) -> None:
+    """Count statements and DB time of the current request via cursor events.
+
+    Statements are counted before execution so failing ones are included;
+    the start time lives on the execution context, which is per statement.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        request = _current_request.get()
+        if request is not None:
+            request.statements += 1
+            if context is not None:
+                context.metrics_started = perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        request = _current_request.get()
+        started = getattr(context, "metrics_started", None)
+        if request is not None and started is not None:
+            request.db_seconds += perf_counter() - started
+
+
+def metrics_middleware(app: ASGIApp, registry: MetricsRegistry) -> ASGIApp:
+    async def middleware(scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await app(scope, receive, send)
+            return
+
+        request = RequestMetrics(started=perf_counter())
+        token = _current_request.set(request)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                request.response_started = perf_counter()
+            await send(message)
+
+        try:
+            await app(scope, receive, send_wrapper)
+        finally:
+            _current_request.reset(token)
+            route = scope.get("path_template") or scope["path"]
+            registry.observe(scope["method"], route, status, request, perf_counter())
+
+    return middleware
+
+
+def _add_di_time(seconds: float) -> None:
+    request = _current_request.get()
+    if request is not None:
+        request.di_seconds += seconds
+
+
+def timed_provider(fn: Callable) -> Callable:
+    """Wrap a dependency provider so its resolution time counts as DI time.
+
+    For generator providers only the part up to the first `yield` is timed;
+    exceptions thrown in at cleanup are forwarded unchanged.
+    """
+    if inspect.isasyncgenfunction(fn):
+        context_manager = asynccontextmanager(fn)
+
+        @wraps(fn)
+        async def timed_async_generator(*args: Any, **kwargs: Any):
+            started = perf_counter()
+            async with context_manager(*args, **kwargs) as value:
+                _add_di_time(perf_counter() - started)
+                yield value
+
+        return timed_async_generator
+
+    if inspect.iscoroutinefunction(fn):
+
+        @wraps(fn)
+        async def timed_async(*args: Any, **kwargs: Any):
+            started = perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                _add_di_time(perf_counter() - started)
+
+        return timed_async
+
+    @wraps(fn)
+    def timed_sync(*args: Any, **kwargs: Any):
+        started = perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _add_di_time(perf_counter() - started)
+
+    return timed_sync
+
+
+class MetricsPlugin(InitPluginProtocol):
+    """Per-route latency, SQL statement/time and DI/serialization metrics on GET /metrics.
+
+    Nothing is installed unless the plugin is added to the app, so a disabled
+    plugin costs nothing.
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        engines: Iterable[Engine] = (),
+        gauges: Callable[[], dict[str, float]] | None = None,
+    ):
+        self.registry = registry
+        self.engines = list(engines)
+        self.gauges = gauges
+
+    def on_app_init(self, app_config: AppConfig) -> AppConfig:
+        for engine in self.engines:
+            install_sql_instrumentation(engine)
+
+        app_config.middleware.insert(0, DefineMiddleware(metrics_middleware, registry=self.registry))
+
+        previous_after_request = app_config.after_request
+
+        async def mark_handler_done(response: Response) -> Response:
+            request = _current_request.get()
+            if request is not None:
+                request.handler_done = perf_counter()
+            if previous_after_request is not None:
+                response = previous_after_request(response)
+                if inspect.isawaitable(response):
+                    response = await response
+            return response
+
+        app_config.after_request = mark_handler_done
+
+        for key, provider in list(app_config.dependencies.items()):
+            if isinstance(provider, Provide) and inspect.isfunction(provider.dependency):
+                is_generator = provider.has_async_generator_dependency or provider.has_sync_generator_dependency
+                app_config.dependencies[key] = Provide(
+                    timed_provider(provider.dependency),
+                    use_cache=provider.use_cache,
+                    sync_to_thread=None if is_generator or not provider.has_sync_callable else False,
+                )
+
+        registry, gauges = self.registry, self.gauges
+
+        @get("/metrics", media_type=MediaType.TEXT, include_in_schema=False)
+        async def metrics() -> str:
+            return registry.render(gauges() if gauges is not None else None)
+
+        app_config.route_handlers.append(metrics)
+        return app_config
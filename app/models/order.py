@@ -0,0 +1,59 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Table, func
+from sqlalchemy.orm import relationship
+
+from app.models.user import Base
+
+# Многие-ко-многим между заказом и продуктами
+order_products = Table(
+    "order_products",
+    Base.metadata,
+    Column("order_id", ForeignKey("orders.id"), primary_key=True),
+    Column("product_id", ForeignKey("products.id"), primary_key=True, index=True),
+)
+
+# lazy="raise": связи грузятся только явной стратегией в репозитории,
+# случайное обращение к незагруженной связи (N+1) падает сразу
+
+
+class Address(Base):
+    __tablename__ = "addresses"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    city = Column(String(100), nullable=False)
+    street = Column(String(200), nullable=False)
+
+    user = relationship("User", lazy="raise")
+
+
+class Product(Base):
+    __tablename__ = "products"
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String(200), nullable=False)
+    price_cents = Column(Integer, nullable=False)
+
+
+class Order(Base):
+    __tablename__ = "orders"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    shipping_address_id = Column(Integer, ForeignKey("addresses.id"), nullable=False, index=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False, index=True)
+    # Сумма цен товаров заказа, обновляется при добавлении товаров
+    total_cents = Column(Integer, nullable=False, server_default="0", index=True)
+
+    user = relationship("User", lazy="raise")
+    shipping_address = relationship("Address", lazy="raise")
+    products = relationship("Product", secondary=order_products, lazy="raise", order_by=Product.id)
+
+
+class UserOrderStats(Base):
+    """Per-user order aggregates, updated incrementally by OrderRepository"""
+
+    __tablename__ = "user_order_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    order_count = Column(Integer, nullable=False, server_default="0")
+    total_spent_cents = Column(Integer, nullable=False, server_default="0")
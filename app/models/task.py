@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Text, JSON
+
+from app.models.user import Base
+
+
+class Task(Base):
+    """Exam task imported from parsed_tasks.json (see app/importer.py)"""
+
+    __tablename__ = "tasks"
+
+    id = Column(Integer, primary_key=True)
+    type = Column(String(100), nullable=False, index=True)
+    text = Column(Text, nullable=False)
+    # Вложенные структуры исходника храним как есть
+    themes = Column(JSON, nullable=False, default=list)
+    variants = Column(JSON, nullable=False, default=list)
+    accordance = Column(JSON, nullable=False, default=dict)
+    images = Column(JSON, nullable=False, default=list)
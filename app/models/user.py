@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, DateTime, func
 from sqlalchemy.ext.declarative import declarative_base
 
+from app.search import install_search_ddl
+
 Base = declarative_base()
 
 class User(Base):
@@ -8,5 +10,13 @@ class User(Base):
 
     id = Column(Integer, primary_key=True)
     username = Column(String(50), unique=True, nullable=False)
-    email = Column(String(100), unique=True, nullable=False)
-    full_name = Column(String(100))
\ No newline at end of file
+    email = Column(String(255), unique=True, nullable=False)
+    full_name = Column(String(100))
+    # Из прежней схемы скриптов (models.py); API его не отдаёт
+    description = Column(String(500))
+    # Версия строки для ETag/If-Match: каждое UPDATE увеличивает её на 1
+    version = Column(Integer, nullable=False, server_default="1")
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+install_search_ddl(User.__table__)
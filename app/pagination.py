@@ -0,0 +1,30 @@
+import base64
+import binascii
+import json
+
+# Id в курсоре и OFFSET (page - 1) * count должны помещаться в BIGINT, иначе драйвер падает
+MAX_ID = 2**63 - 1
+MAX_PAGE_SIZE = 1000
+MAX_PAGE = MAX_ID // MAX_PAGE_SIZE
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the last seen user ID into an opaque cursor"""
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode an opaque cursor; an empty cursor starts from the beginning"""
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        last_id = payload["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+    # bool — подкласс int: {"id": true} тоже отвергаем
+    if type(last_id) is not int or not 0 <= last_id <= MAX_ID:
+        raise ValueError("Invalid cursor")
+    return last_id
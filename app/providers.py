@@ -1,26 +1,70 @@
 from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import sessionmaker
+from litestar.datastructures import State
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.cache import CacheBackend
+from app.repositories.cached_user_repository import CachedUserRepository
 from app.repositories.user_repository import UserRepository
+from app.services.order_service import OrderService
+from app.services.product_service import ProductService
 from app.services.user_service import UserService
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    from app.main import async_session_factory
-    async with async_session_factory() as session:
-        yield session
+# Сервисы и репозитории не хранят состояния запроса: они создаются один раз в lifespan
+# приложения (app/main.py) и живут в app.state, сессия передаётся в каждый метод.
+# Провайдеры сервисов синхронные и только достают их из state. Параметр db_session в них
+# не используется: он задаёт порядок. Независимые зависимости одного уровня Litestar
+# разрешает в anyio task group, и на каждый запрос это дороже всего остального DI;
+# цепочка db_session -> сервис разрешается последовательно.
+
+async def provide_db_session(state: State) -> AsyncGenerator[AsyncSession, None]:
+    """Request-scoped session; only handlers that declare `db_session` get one.
 
-async def provide_db_session() -> AsyncGenerator[AsyncSession, None]:
-    """Database session provider"""
-    async for session in get_session():
+    The session takes a connection on its first statement. If it never ran
+    one (or already committed), closing it is skipped: close() goes through a
+    greenlet and costs more than the rest of the DI for the request.
+    """
+    session = state.session_factory()
+    try:
         yield session
+    finally:
+        if session.in_transaction():
+            await session.close()
 
-async def provide_user_repository(db_session: AsyncSession) -> UserRepository:
-    """User repository provider"""
-    repo = UserRepository()
-    repo.session = db_session
-    return repo
+def provide_session_factory(state: State) -> async_sessionmaker:
+    """Session factory for handlers whose work outlives the request-scoped session (streaming)"""
+    return state.session_factory
 
-async def provide_user_service(user_repository: UserRepository) -> UserService:
+def provide_user_service(state: State, db_session: AsyncSession) -> UserService:
     """User service provider"""
-    return UserService(user_repository)
\ No newline at end of file
+    return state.user_service
+
+def provide_order_service(state: State, db_session: AsyncSession) -> OrderService:
+    """Order service provider"""
+    return state.order_service
+
+def provide_product_service(state: State, db_session: AsyncSession) -> ProductService:
+    """Product service provider"""
+    return state.product_service
+
+def make_user_repository(user_cache: CacheBackend | None = None) -> UserRepository:
+    return CachedUserRepository(user_cache) if user_cache is not None else UserRepository()
+
+async def flush_user_updates(session_factory: async_sessionmaker, user_repository: UserRepository, changes: dict) -> None:
+    """Flush function of the app's write-behind queue: one transaction per batch"""
+    async with session_factory() as session:
+        await user_repository.apply_updates(session, changes)
+
+async def load_users(session_factory: async_sessionmaker, user_repository: UserRepository, user_ids: list[int]) -> dict:
+    """Batch function of the app's user loader: its own session, shared by all coalesced requests"""
+    async with session_factory() as session:
+        return await user_repository.get_read_by_ids(session, user_ids)
+
+async def count_users(session_factory: async_sessionmaker, user_repository: UserRepository) -> int:
+    """Count function of the app's cached users total"""
+    async with session_factory() as session:
+        return await user_repository.count(session)
+
+async def estimate_users(session_factory: async_sessionmaker, user_repository: UserRepository) -> int | None:
+    """Estimate function of the app's cached users total: planner statistics, no scan"""
+    async with session_factory() as session:
+        return await user_repository.estimate_count(session)
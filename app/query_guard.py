@@ -0,0 +1,113 @@
+import re
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryCounter:
+    """Context manager recording every SQL statement an engine sends to the DBAPI"""
+
+    def __init__(self, engine: Engine | AsyncEngine):
+        self.engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+        self.statements: list[str] = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+@contextmanager
+def assert_max_queries(engine: Engine | AsyncEngine, limit: int) -> Iterator[QueryCounter]:
+    """Fail with AssertionError if the block executes more than `limit` statements"""
+    with QueryCounter(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        statements = "\n".join(f"  {' '.join(s.split())}" for s in counter.statements)
+        raise AssertionError(f"{counter.count} queries executed, at most {limit} allowed:\n{statements}")
+
+
+# "SCAN users" / "SCAN TABLE users AS u": полный проход по таблице без индекса.
+# "SCAN users USING INDEX ..." и "SEARCH ..." не считаются
+_SQLITE_FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+_POSTGRES_FULL_SCAN = re.compile(r"Seq Scan on (\w+)")
+# Проход по материализованному подзапросу (anon_1) — не проход по таблице
+_SQLITE_SUBQUERY = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\w+)$")
+_ALIAS = re.compile(r"(?:FROM|JOIN)\s+\(?(\w+)\s+AS\s+(\w+)", re.IGNORECASE)
+
+
+class QueryPlanAdvisor:
+    """Context manager explaining every statement an engine runs and collecting full table scans.
+
+    Each SELECT/UPDATE/DELETE is passed through EXPLAIN QUERY PLAN (SQLite) or
+    EXPLAIN (PostgreSQL) on the same DBAPI connection with the same parameters.
+    `scans` maps table name to the statements that scanned it.
+    """
+
+    def __init__(self, engine: Engine | AsyncEngine):
+        self.engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+        self.scans: dict[str, list[str]] = {}
+
+    def _explain(self, conn, statement, parameters) -> list[str]:
+        # Сырой DBAPI-курсор: EXPLAIN не должен снова попасть в события движка
+        cursor = conn.connection.cursor()
+        try:
+            if conn.dialect.name == "sqlite":
+                cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                return [row[-1] for row in cursor.fetchall()]
+            cursor.execute(f"EXPLAIN {statement}", parameters)
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if executemany or statement.lstrip().split(None, 1)[0].upper() not in ("SELECT", "UPDATE", "DELETE", "WITH"):
+            return
+        pattern = _SQLITE_FULL_SCAN if conn.dialect.name == "sqlite" else _POSTGRES_FULL_SCAN
+        # План называет таблицы по псевдонимам (products_1) — сводим к именам таблиц
+        aliases = {alias: table for table, alias in _ALIAS.findall(statement)}
+        subqueries = set()
+        for line in self._explain(conn, statement, parameters):
+            line = line.strip()
+            materialized = _SQLITE_SUBQUERY.match(line)
+            if materialized:
+                subqueries.add(materialized.group(1))
+                continue
+            match = pattern.search(line)
+            if match and match.group(1) not in subqueries:
+                table = aliases.get(match.group(1), match.group(1))
+                self.scans.setdefault(table, []).append(statement)
+
+    def __enter__(self) -> "QueryPlanAdvisor":
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+@contextmanager
+def assert_no_full_scans(engine: Engine | AsyncEngine, allowed: Iterable[str] = ()) -> Iterator[QueryPlanAdvisor]:
+    """Fail with AssertionError if the block scans a table not listed in `allowed`"""
+    with QueryPlanAdvisor(engine) as advisor:
+        yield advisor
+    unexpected = {table: statements for table, statements in advisor.scans.items() if table not in set(allowed)}
+    if unexpected:
+        lines = [
+            f"  {table}: {' '.join(statement.split())}"
+            for table, statements in unexpected.items()
+            for statement in statements
+        ]
+        raise AssertionError("Full table scans:\n" + "\n".join(lines))
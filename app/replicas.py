@@ -0,0 +1,188 @@
+"""Read replicas: sessions send reads to a replica engine and writes to the primary.
+
+Routing happens in `RoutingSession.get_bind`, so repositories keep using a
+single session. INSERT/UPDATE/DELETE, flushes and SELECT ... FOR UPDATE go
+to the primary, and once a session has written, the rest of it stays on the
+primary. Other reads go to one replica per session.
+
+Read-your-writes across requests: after a request writes, the middleware
+sets a cookie holding a deadline. Until that deadline passes, the client's
+requests read from the primary, which covers replication lag.
+"""
+import itertools
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from http.cookies import CookieError, SimpleCookie
+from math import ceil
+
+from litestar.types import ASGIApp, Receive, Scope, Send
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+REPLICA_POLICIES = ("round_robin", "least_latency")
+
+# Ключ session.info: все запросы сессии идут на primary
+USE_PRIMARY = "use_primary"
+STICKY_COOKIE = "db_primary_until"
+
+# least_latency раз в столько выборов берёт реплику по кругу, чтобы обновить её задержку
+_PROBE_EVERY = 16
+_LATENCY_ALPHA = 0.2
+
+
+class ReplicaSet:
+    """Replica engines and the policy picking one of them for a session"""
+
+    def __init__(self, engines: list[AsyncEngine], policy: str = "round_robin"):
+        if not engines:
+            raise ValueError("At least one replica engine is required")
+        if policy not in REPLICA_POLICIES:
+            raise ValueError(f"Unsupported replica policy: {policy}")
+        self.engines: list[Engine] = [engine.sync_engine for engine in engines]
+        self.policy = policy
+        self._round_robin = itertools.cycle(range(len(self.engines)))
+        self._choices = 0
+        # Экспоненциальное среднее времени одного запроса, секунды; 0 — ещё не измерено
+        self.latency = [0.0] * len(self.engines)
+        self.picks = [0] * len(self.engines)
+        for index, engine in enumerate(self.engines):
+            self._track_latency(index, engine)
+
+    def _track_latency(self, index: int, engine: Engine) -> None:
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                context.replica_started = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            started = getattr(context, "replica_started", None)
+            if started is not None:
+                elapsed = time.perf_counter() - started
+                previous = self.latency[index]
+                self.latency[index] = elapsed if not previous else previous + _LATENCY_ALPHA * (elapsed - previous)
+
+    def choose(self) -> Engine:
+        self._choices += 1
+        if self.policy == "least_latency" and self._choices % _PROBE_EVERY:
+            index = min(range(len(self.engines)), key=self.latency.__getitem__)
+        else:
+            index = next(self._round_robin)
+        self.picks[index] += 1
+        return self.engines[index]
+
+    def stats(self) -> dict[str, float]:
+        stats = {}
+        for index, (picks, latency) in enumerate(zip(self.picks, self.latency)):
+            stats[f"replica{index}_picks"] = picks
+            stats[f"replica{index}_latency_ms"] = round(latency * 1000, 3)
+        return stats
+
+
+@dataclass
+class _RequestRouting:
+    pinned: bool = False
+    wrote: bool = False
+
+
+_request_routing: ContextVar[_RequestRouting | None] = ContextVar("request_routing", default=None)
+
+
+def mark_request_wrote() -> None:
+    """Give the client the sticky cookie for a write that reaches the database later (write-behind)"""
+    routing = _request_routing.get()
+    if routing is not None:
+        routing.wrote = True
+
+
+def reads_pinned_to_primary() -> bool:
+    """Whether the current request must read from the primary (it wrote recently)"""
+    routing = _request_routing.get()
+    return routing is not None and routing.pinned
+
+
+class RoutingSession(Session):
+    """Session whose reads go to a replica until its first write"""
+
+    def __init__(self, *args, replicas: ReplicaSet | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self._replica: Engine | None = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        primary = super().get_bind(mapper=mapper, clause=clause, **kw)
+        if self.replicas is None:
+            return primary
+        if self._flushing or (clause is not None and (clause.is_dml or _locks_rows(clause))):
+            self.info[USE_PRIMARY] = True
+            mark_request_wrote()
+            return primary
+        if self.info.get(USE_PRIMARY) or reads_pinned_to_primary():
+            return primary
+        # Одна реплика на сессию: все чтения запроса видят один и тот же снимок
+        if self._replica is None:
+            self._replica = self.replicas.choose()
+        return self._replica
+
+    @property
+    def read_from_replica(self) -> bool:
+        return self._replica is not None
+
+
+def read_from_replica(session: AsyncSession) -> bool:
+    """Whether the session has read from a replica: its rows may lag behind the primary"""
+    return getattr(session.sync_session, "read_from_replica", False)
+
+
+def _locks_rows(clause) -> bool:
+    return getattr(clause, "_for_update_arg", None) is not None
+
+
+def make_session_factory(primary: AsyncEngine, replicas: ReplicaSet | None = None) -> async_sessionmaker:
+    if replicas is None:
+        return async_sessionmaker(primary, class_=AsyncSession, expire_on_commit=False)
+    return async_sessionmaker(
+        primary, class_=AsyncSession, sync_session_class=RoutingSession, expire_on_commit=False, replicas=replicas
+    )
+
+
+def _sticky_deadline(scope: Scope) -> float:
+    for name, value in scope["headers"]:
+        if name == b"cookie":
+            try:
+                morsel = SimpleCookie(value.decode("latin-1")).get(STICKY_COOKIE)
+                return float(morsel.value) if morsel is not None else 0.0
+            except (CookieError, ValueError):
+                return 0.0
+    return 0.0
+
+
+def read_your_writes_middleware(app: ASGIApp, window: float) -> ASGIApp:
+    """Pin a client's reads to the primary for `window` seconds after it writes"""
+
+    async def middleware(scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await app(scope, receive, send)
+            return
+
+        routing = _RequestRouting(pinned=_sticky_deadline(scope) > time.time())
+        token = _request_routing.set(routing)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and routing.wrote:
+                cookie = (
+                    f"{STICKY_COOKIE}={time.time() + window:.3f}; Max-Age={ceil(window)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode())]}
+            await send(message)
+
+        try:
+            await app(scope, receive, send_wrapper)
+        finally:
+            _request_routing.reset(token)
+
+    return middleware
@@ -0,0 +1,90 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import CacheBackend
+from app.models.user import User
+from app.replicas import read_from_replica, reads_pinned_to_primary
+from app.repositories.user_repository import UserRepository
+from app.schemas.user_schema import UserUpdate, UserRead
+
+
+class CachedUserRepository(UserRepository):
+    """Read-through cache for get_read_by_id; writes invalidate the entry.
+
+    Entries are immutable UserRead structs rather than ORM instances, so they
+    are never bound to a (closed) session. The cache is shared by all clients,
+    so it only holds rows read from the primary: a lagging replica would put
+    back a version older than a client's own write. Requests pinned to the
+    primary after a write bypass it (another worker may hold an older entry).
+    """
+
+    def __init__(self, cache: CacheBackend):
+        self.cache = cache
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"user:{user_id}"
+
+    async def get_read_by_id(self, session: AsyncSession, user_id: int) -> UserRead | None:
+        if not reads_pinned_to_primary():
+            user = await self.cache.get(self._key(user_id))
+            if user is not None:
+                return user
+        user = await super().get_read_by_id(session, user_id)
+        if user is not None and not read_from_replica(session):
+            await self.cache.set(self._key(user_id), user)
+        return user
+
+    async def get_read_by_ids(self, session: AsyncSession, user_ids: list[int]) -> dict[int, UserRead]:
+        users = {}
+        if not reads_pinned_to_primary():
+            for user_id in user_ids:
+                user = await self.cache.get(self._key(user_id))
+                if user is not None:
+                    users[user_id] = user
+        missing = [user_id for user_id in user_ids if user_id not in users]
+        if missing:
+            found = await super().get_read_by_ids(session, missing)
+            if not read_from_replica(session):
+                for user_id, user in found.items():
+                    await self.cache.set(self._key(user_id), user)
+            users.update(found)
+        return users
+
+    async def update(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        user_data: UserUpdate,
+        expected_versions: list[int] | None = None,
+    ) -> User:
+        try:
+            return await super().update(session, user_id, user_data, expected_versions)
+        finally:
+            await self.cache.delete(self._key(user_id))
+
+    async def apply_updates(self, session: AsyncSession, changes: dict[int, dict]) -> None:
+        try:
+            await super().apply_updates(session, changes)
+        finally:
+            for user_id in changes:
+                await self.cache.delete(self._key(user_id))
+
+    async def delete(self, session: AsyncSession, user_id: int, expected_versions: list[int] | None = None) -> bool:
+        try:
+            return await super().delete(session, user_id, expected_versions)
+        finally:
+            await self.cache.delete(self._key(user_id))
+
+    async def bulk_update(self, session: AsyncSession, items: list[dict]) -> list[User]:
+        try:
+            return await super().bulk_update(session, items)
+        finally:
+            for item in items:
+                await self.cache.delete(self._key(item["id"]))
+
+    async def bulk_delete(self, session: AsyncSession, user_ids: set[int]) -> list[int]:
+        try:
+            return await super().bulk_delete(session, user_ids)
+        finally:
+            for user_id in user_ids:
+                await self.cache.delete(self._key(user_id))
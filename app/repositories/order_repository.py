@@ -0,0 +1,262 @@
+from typing import Literal
+
+from sqlalchemy import select, insert, update, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, contains_eager
+
+from app.exceptions import OrderConflictError
+from app.models.order import Order, Product, Address, UserOrderStats, order_products
+from app.models.user import User
+from app.replicas import USE_PRIMARY
+from app.schemas.order_schema import OrderRead, OrderSummary, AddressRead, ProductRead, UserOrderStatsRead
+
+LoadStrategy = Literal["selectin", "joined", "projection"]
+
+
+def _to_read(order: Order) -> OrderRead:
+    address = order.shipping_address
+    return OrderRead(
+        id=order.id,
+        user_id=order.user_id,
+        created_at=order.created_at,
+        total_cents=order.total_cents,
+        shipping_address=AddressRead(address.id, address.city, address.street),
+        products=[ProductRead(p.id, p.title, p.price_cents) for p in order.products],
+    )
+
+
+class OrderRepository:
+    """Orders with their shipping address and products.
+
+    Every read states how relationships are loaded; the relationships
+    themselves are lazy="raise", so nothing is loaded implicitly:
+    - selectin: one query for orders + one IN query per relationship (3 total)
+    - joined: a single LEFT OUTER JOIN query, rows de-duplicated in Python
+    - projection: a single join selecting plain columns, no ORM objects
+    """
+
+    @staticmethod
+    def _use_primary(session: AsyncSession) -> None:
+        # Проверки перед записью (адрес, цены, уже добавленные товары) не должны читать отстающую реплику
+        session.info[USE_PRIMARY] = True
+
+    @staticmethod
+    def _orders_query(strategy: LoadStrategy, order_filter):
+        if strategy == "joined":
+            # Плоские явные JOIN вместо joinedload: для many-to-many SQLAlchemy строит
+            # вложенный LEFT OUTER JOIN (order_products JOIN products), который SQLite
+            # материализует полным проходом по order_products
+            return (
+                select(Order)
+                .join(Order.shipping_address)
+                .outerjoin(order_products, order_products.c.order_id == Order.id)
+                .outerjoin(Product, Product.id == order_products.c.product_id)
+                .options(contains_eager(Order.shipping_address), contains_eager(Order.products))
+                .where(*order_filter)
+                .order_by(Order.id, Product.id)
+            )
+        return (
+            select(Order)
+            .options(selectinload(Order.shipping_address), selectinload(Order.products))
+            .where(*order_filter)
+            .order_by(Order.id)
+        )
+
+    async def _get_projected(
+        self,
+        session: AsyncSession,
+        order_filter,
+        count: int | None = None,
+        offset: int = 0,
+    ) -> list[OrderRead]:
+        orders = select(Order.id).where(*order_filter).order_by(Order.id)
+        if count is not None:
+            orders = orders.offset(offset).limit(count)
+        orders = orders.subquery()
+        query = (
+            select(
+                Order.id, Order.user_id, Order.created_at, Order.total_cents,
+                Address.id, Address.city, Address.street,
+                Product.id, Product.title, Product.price_cents,
+            )
+            .join(orders, orders.c.id == Order.id)
+            .join(Address, Address.id == Order.shipping_address_id)
+            .outerjoin(order_products, order_products.c.order_id == Order.id)
+            .outerjoin(Product, Product.id == order_products.c.product_id)
+            .order_by(Order.id, Product.id)
+        )
+        result = await session.execute(query)
+
+        reads: dict[int, OrderRead] = {}
+        for order_id, user_id, created_at, total_cents, address_id, city, street, product_id, title, price_cents in result:
+            read = reads.get(order_id)
+            if read is None:
+                read = reads[order_id] = OrderRead(
+                    order_id, user_id, created_at, total_cents, AddressRead(address_id, city, street), []
+                )
+            if product_id is not None:
+                read.products.append(ProductRead(product_id, title, price_cents))
+        return list(reads.values())
+
+    async def get_by_id(
+        self,
+        session: AsyncSession,
+        order_id: int,
+        strategy: LoadStrategy = "joined",
+    ) -> OrderRead | None:
+        if strategy == "projection":
+            orders = await self._get_projected(session, [Order.id == order_id])
+            return orders[0] if orders else None
+        result = await session.execute(self._orders_query(strategy, [Order.id == order_id]))
+        order = result.unique().scalar_one_or_none()
+        return _to_read(order) if order is not None else None
+
+    async def get_by_filter(
+        self,
+        session: AsyncSession,
+        count: int | None = None,
+        page: int | None = None,
+        strategy: LoadStrategy = "selectin",
+        user_id: int | None = None,
+    ) -> list[OrderRead]:
+        order_filter = [Order.user_id == user_id] if user_id is not None else []
+        offset = (page - 1) * count if count is not None and page is not None else 0
+        if strategy == "projection":
+            return await self._get_projected(session, order_filter, count, offset)
+
+        query = self._orders_query(strategy, order_filter)
+        if count is not None and page is not None:
+            if strategy == "joined":
+                # LIMIT по строкам JOIN обрезал бы товары — ограничиваем сами заказы
+                page_ids = select(Order.id).where(*order_filter).order_by(Order.id).offset(offset).limit(count)
+                query = query.where(Order.id.in_(page_ids))
+            else:
+                query = query.offset(offset).limit(count)
+        result = await session.execute(query)
+        return [_to_read(order) for order in result.unique().scalars()]
+
+    async def get_top(self, session: AsyncSession, n: int) -> list[OrderSummary]:
+        """Most expensive orders, straight from the indexed total_cents column"""
+        query = (
+            select(Order.id, Order.user_id, Order.created_at, Order.total_cents)
+            .order_by(Order.total_cents.desc(), Order.id)
+            .limit(n)
+        )
+        result = await session.execute(query)
+        return [OrderSummary(*row) for row in result]
+
+    async def get_user_stats(self, session: AsyncSession, user_id: int) -> UserOrderStatsRead | None:
+        """Order count and lifetime spend of a user; None if the user does not exist"""
+        query = (
+            select(User.id, UserOrderStats.order_count, UserOrderStats.total_spent_cents)
+            .outerjoin(UserOrderStats, UserOrderStats.user_id == User.id)
+            .where(User.id == user_id)
+        )
+        row = (await session.execute(query)).first()
+        if row is None:
+            return None
+        return UserOrderStatsRead(row[0], row[1] or 0, row[2] or 0)
+
+    async def _products_total(self, session: AsyncSession, product_ids: set[int]) -> int:
+        if not product_ids:
+            return 0
+        query = select(func.count(Product.id), func.coalesce(func.sum(Product.price_cents), 0)).where(
+            Product.id.in_(product_ids)
+        )
+        found, total = (await session.execute(query)).one()
+        if found != len(product_ids):
+            raise ValueError("Some products do not exist")
+        return total
+
+    async def _add_user_spend(self, session: AsyncSession, user_id: int, orders: int, spent_cents: int) -> None:
+        """Upsert the user's aggregates: INSERT ... ON CONFLICT DO UPDATE with increments"""
+        dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(UserOrderStats).values(
+            user_id=user_id, order_count=orders, total_spent_cents=spent_cents
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserOrderStats.user_id],
+            set_={
+                "order_count": UserOrderStats.order_count + stmt.excluded.order_count,
+                "total_spent_cents": UserOrderStats.total_spent_cents + stmt.excluded.total_spent_cents,
+            },
+        )
+        await session.execute(stmt)
+
+    async def create(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        shipping_address_id: int,
+        product_ids: list[int],
+    ) -> int:
+        """Create an order with its products; total and user stats are updated in the same transaction"""
+        self._use_primary(session)
+        try:
+            address = await session.execute(
+                select(Address.user_id).where(Address.id == shipping_address_id)
+            )
+            if address.scalar_one_or_none() != user_id:
+                raise ValueError("Shipping address does not belong to the user")
+
+            product_ids = set(product_ids)
+            total = await self._products_total(session, product_ids)
+            order_id = await session.scalar(
+                insert(Order)
+                .values(user_id=user_id, shipping_address_id=shipping_address_id, total_cents=total)
+                .returning(Order.id)
+            )
+            if product_ids:
+                await session.execute(
+                    insert(order_products),
+                    [{"order_id": order_id, "product_id": product_id} for product_id in product_ids],
+                )
+            await self._add_user_spend(session, user_id, 1, total)
+            await session.commit()
+            return order_id
+        except Exception:
+            await session.rollback()
+            raise
+
+    async def add_products(self, session: AsyncSession, order_id: int, product_ids: list[int]) -> bool:
+        """Attach products to an order and add their prices to the stored totals.
+
+        Products already on the order are skipped. Returns False if the order does not exist.
+        """
+        self._use_primary(session)
+        try:
+            # Сначала блокируем заказ (на SQLite — берём блокировку записи): параллельный вызов
+            # прочитает уже добавленные товары только после нашего коммита
+            user_id = await session.scalar(
+                update(Order)
+                .where(Order.id == order_id)
+                .values(total_cents=Order.total_cents)
+                .returning(Order.user_id)
+            )
+            if user_id is None:
+                await session.rollback()
+                return False
+            attached = await session.execute(
+                select(order_products.c.product_id).where(order_products.c.order_id == order_id)
+            )
+            new_ids = set(product_ids) - set(attached.scalars())
+            if new_ids:
+                delta = await self._products_total(session, new_ids)
+                await session.execute(
+                    update(Order).where(Order.id == order_id).values(total_cents=Order.total_cents + delta)
+                )
+                await session.execute(
+                    insert(order_products),
+                    [{"order_id": order_id, "product_id": product_id} for product_id in new_ids],
+                )
+                await self._add_user_spend(session, user_id, 0, delta)
+            await session.commit()
+            return True
+        except IntegrityError as e:
+            await session.rollback()
+            raise OrderConflictError() from e
+        except Exception:
+            await session.rollback()
+            raise
@@ -0,0 +1,19 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.order import Product
+from app.schemas.order_schema import ProductRead
+
+
+class ProductRepository:
+    async def get_by_filter(
+        self,
+        session: AsyncSession,
+        count: int | None = None,
+        page: int | None = None,
+    ) -> list[ProductRead]:
+        query = select(Product.id, Product.title, Product.price_cents).order_by(Product.id)
+        if count is not None and page is not None:
+            query = query.offset((page - 1) * count).limit(count)
+        result = await session.execute(query)
+        return [ProductRead(*row) for row in result]
@@ -1,62 +1,383 @@
-from sqlalchemy import select
+from typing import AsyncIterator
+
+from sqlalchemy import select, insert, update, delete, or_, func, literal_column, table, column, bindparam, text
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.exceptions import UserAlreadyExistsError, PreconditionFailedError
 from app.models.user import User
-from app.schemas.user_schema import UserCreate, UserUpdate
+from app.replicas import USE_PRIMARY
+from app.schemas.user_schema import UserCreate, UserUpdate, UserRead, user_projection
+from app.search import fts5_phrase
+
+# Колонки в порядке полей UserRead: строку можно передать в UserRead(*row)
+_READ_COLUMNS = tuple(getattr(User, field) for field in UserRead.__struct_fields__)
+
+
+def _read_shape(fields: tuple[str, ...] | None) -> tuple[tuple, type]:
+    """Columns to select and the struct to build from each row; `fields` narrows both"""
+    if fields is None:
+        return _READ_COLUMNS, UserRead
+    return tuple(getattr(User, field) for field in fields), user_projection(fields)
+
+# FTS5-таблица из app.search; rowid совпадает с users.id
+_users_fts = table("users_fts", column("rowid"))
+
+# Литералы вместо bind-параметров: выражение должно совпасть с GIN-индексом ix_users_search_trgm
+USER_SEARCH_EXPRESSION = (
+    User.username.concat(literal_column("' '"))
+    .concat(func.coalesce(User.full_name, literal_column("''")))
+    .concat(literal_column("' '"))
+    .concat(User.email)
+)
+
+
+def _is_unique_violation(error: IntegrityError) -> bool:
+    """Whether the IntegrityError is a duplicate username/email, not e.g. NOT NULL or a primary key collision"""
+    # PostgreSQL-драйверы отдают SQLSTATE (23505 — unique_violation), SQLite — только текст
+    sqlstate = getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+    if sqlstate is not None:
+        if sqlstate != "23505":
+            return False
+        # Имя ограничения (users_email_key, uq_users_username): psycopg — в diag, asyncpg — в своём исключении
+        constraint = (
+            getattr(getattr(error.orig, "diag", None), "constraint_name", None)
+            or getattr(error.orig.__cause__, "constraint_name", None)
+            or str(error.orig)
+        )
+        return any(f"_{column}" in constraint for column in ("username", "email"))
+    message = str(error.orig)
+    return "UNIQUE constraint failed" in message and any(
+        f"users.{column}" in message for column in ("username", "email")
+    )
 
 class UserRepository:
-    def __init__(self):
-        self.session: AsyncSession | None = None
+    """Stateless: one instance per app, the request's session is passed to every method"""
+
+    @staticmethod
+    def _use_primary(session: AsyncSession) -> None:
+        # Чтения, по которым принимается решение о записи, — с primary: реплика может отставать
+        session.info[USE_PRIMARY] = True
 
-    async def get_by_id(self, user_id: int) -> User | None:
+    async def get_by_id(self, session: AsyncSession, user_id: int) -> User | None:
         query = select(User).where(User.id == user_id)
-        result = await self.session.execute(query)
+        result = await session.execute(query)
         return result.scalar_one_or_none()
 
-    async def get_by_filter(self, count: int | None = None, page: int | None = None, **kwargs) -> list[User]:
-        query = select(User)
-        if kwargs:
-            for key, value in kwargs.items():
-                if hasattr(User, key) and value is not None:
-                    query = query.where(getattr(User, key) == value)
-        
+    async def get_read_by_id(self, session: AsyncSession, user_id: int) -> UserRead | None:
+        """get_by_id without ORM hydration"""
+        result = await session.execute(select(*_READ_COLUMNS).where(User.id == user_id))
+        row = result.first()
+        return UserRead(*row) if row is not None else None
+
+    async def get_read_by_ids(self, session: AsyncSession, user_ids: list[int]) -> dict[int, UserRead]:
+        """Batched get_read_by_id: one WHERE id IN (...) for all ids, missing ids are absent"""
+        result = await session.execute(select(*_READ_COLUMNS).where(User.id.in_(user_ids)))
+        users = (UserRead(*row) for row in result)
+        return {user.id: user for user in users}
+
+    @staticmethod
+    def _apply_filters(query, **kwargs):
+        for key, value in kwargs.items():
+            if hasattr(User, key) and value is not None:
+                query = query.where(getattr(User, key) == value)
+        return query
+
+    async def get_by_filter(
+        self,
+        session: AsyncSession,
+        count: int | None = None,
+        page: int | None = None,
+        **kwargs,
+    ) -> list[User]:
+        query = self._apply_filters(select(User), **kwargs)
+
         if count is not None and page is not None:
             offset = (page - 1) * count
-            query = query.offset(offset).limit(count)
-        
-        result = await self.session.execute(query)
+            query = query.order_by(User.id).offset(offset).limit(count)
+
+        result = await session.execute(query)
         return list(result.scalars().all())
 
-    async def create(self, user_data: UserCreate) -> User:
+    async def get_read_by_filter(
+        self,
+        session: AsyncSession,
+        count: int | None = None,
+        page: int | None = None,
+        fields: tuple[str, ...] | None = None,
+        **kwargs,
+    ) -> list[UserRead]:
+        """get_by_filter selecting plain columns straight into UserRead (only `fields`, if given)"""
+        columns, row_type = _read_shape(fields)
+        query = self._apply_filters(select(*columns), **kwargs)
+
+        if count is not None and page is not None:
+            offset = (page - 1) * count
+            query = query.order_by(User.id).offset(offset).limit(count)
+
+        result = await session.execute(query)
+        return [row_type(*row) for row in result]
+
+    async def get_after_id(
+        self,
+        session: AsyncSession,
+        after_id: int,
+        count: int,
+        fields: tuple[str, ...] | None = None,
+        **kwargs,
+    ) -> list[UserRead]:
+        """Keyset page: the next `count` users with id greater than `after_id`"""
+        columns, row_type = _read_shape(fields)
+        query = self._apply_filters(select(*columns), **kwargs)
+        query = query.where(User.id > after_id).order_by(User.id).limit(count)
+        result = await session.execute(query)
+        return [row_type(*row) for row in result]
+
+    async def search(self, session: AsyncSession, q: str, limit: int = 20) -> list[UserRead]:
+        """Users whose username, full_name or email contains `q` (case-insensitive).
+
+        PostgreSQL ranks by trigram similarity; SQLite returns matches in id order.
+        """
+        if session.bind.dialect.name == "postgresql":
+            expression = USER_SEARCH_EXPRESSION
+            query = (
+                select(*_READ_COLUMNS)
+                .where(expression.icontains(q, autoescape=True))
+                .order_by(func.similarity(expression, q).desc(), User.id)
+            )
+        else:
+            query = (
+                select(*_READ_COLUMNS)
+                .join(_users_fts, _users_fts.c.rowid == User.id)
+                .where(literal_column("users_fts").op("MATCH")(fts5_phrase(q)))
+                # FTS5 отдаёт совпадения по возрастанию rowid: LIMIT останавливает поиск сразу,
+                # а ORDER BY rank считал бы bm25 для всех совпадений (сотни мс на частых словах)
+                .order_by(_users_fts.c.rowid)
+            )
+        result = await session.execute(query.limit(limit))
+        return [UserRead(*row) for row in result]
+
+    async def count(self, session: AsyncSession) -> int:
+        result = await session.execute(select(func.count()).select_from(User))
+        return result.scalar_one()
+
+    async def estimate_count(self, session: AsyncSession) -> int | None:
+        """Row count from the planner's statistics (no table scan); None if there are none yet"""
+        if session.bind.dialect.name == "postgresql":
+            # reltuples = -1, пока таблицу не анализировали (PostgreSQL 14+)
+            query = text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'users'::regclass")
+        else:
+            # Первое число в sqlite_stat1 — строк в таблице; таблица появляется после ANALYZE
+            query = text("SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = 'users' LIMIT 1")
         try:
-            user = User(
-                username=user_data.username,
-                email=user_data.email,
-                full_name=user_data.full_name
-            )
-            self.session.add(user)
-            await self.session.commit()
-            await self.session.refresh(user)
+            result = await session.execute(query)
+        except DBAPIError:
+            return None
+        estimate = result.scalar()
+        return estimate if estimate is not None and estimate >= 0 else None
+
+    EXPORT_COLUMNS = ("id", "username", "email", "full_name")
+
+    async def stream_rows(self, session: AsyncSession, batch_size: int = 1000) -> AsyncIterator[tuple]:
+        """Stream all users as plain tuples (EXPORT_COLUMNS) with a server-side cursor"""
+        query = (
+            select(*(getattr(User, column) for column in self.EXPORT_COLUMNS))
+            .order_by(User.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await session.stream(query)
+        async for row in result:
+            yield tuple(row)
+
+    async def create(self, session: AsyncSession, user_data: UserCreate) -> User:
+        # Один INSERT ... RETURNING вместо INSERT + SELECT из session.refresh()
+        try:
+            result = await session.scalars(
+                insert(User)
+                .values(
+                    username=user_data.username,
+                    email=user_data.email,
+                    full_name=user_data.full_name
+                )
+                .returning(User)
+            )
+            user = result.one()
+            await session.commit()
             return user
+        except IntegrityError as e:
+            # Уникальность username/email проверяет сама БД — без отдельного SELECT
+            await session.rollback()
+            if _is_unique_violation(e):
+                raise UserAlreadyExistsError() from e
+            raise
         except Exception as e:
-            await self.session.rollback()
+            await session.rollback()
             raise e
 
-    async def update(self, user_id: int, user_data: UserUpdate) -> User:
-        user = await self.get_by_id(user_id)
-        if not user:
-            return None
+    async def update(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        user_data: UserUpdate,
+        expected_versions: list[int] | None = None,
+    ) -> User:
+        """UPDATE ... RETURNING that bumps the row version.
 
+        With `expected_versions` (from If-Match) the row is only updated if its
+        version is one of them, otherwise PreconditionFailedError is raised.
+        Any other non-None value (If-Match: *) only requires the row to exist.
+        """
         update_data = user_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(user, field, value)
+        if not update_data:
+            self._use_primary(session)
+            user = await self.get_by_id(session, user_id)
+            if expected_versions is not None and (
+                user is None or (isinstance(expected_versions, list) and user.version not in expected_versions)
+            ):
+                raise PreconditionFailedError()
+            return user
 
-        await self.session.commit()
-        await self.session.refresh(user)
+        query = update(User).where(User.id == user_id)
+        if isinstance(expected_versions, list):
+            # Проверка версии и запись — одно условие в UPDATE, без гонки между SELECT и UPDATE
+            query = query.where(User.version.in_(expected_versions))
+        try:
+            result = await session.scalars(
+                query.values(**update_data, version=User.version + 1, updated_at=func.now()).returning(User)
+            )
+            user = result.one_or_none()
+            await session.commit()
+        except IntegrityError as e:
+            await session.rollback()
+            if _is_unique_violation(e):
+                raise UserAlreadyExistsError() from e
+            raise
+        if user is None and expected_versions is not None:
+            raise PreconditionFailedError()
         return user
 
-    async def delete(self, user_id: int) -> None:
-        user = await self.get_by_id(user_id)
-        if user:
-            await self.session.delete(user)
-            await self.session.commit()
\ No newline at end of file
+    @staticmethod
+    async def _update_many(session: AsyncSession, changes: dict[int, dict]) -> None:
+        """{user_id: fields} as executemany UPDATEs, one per field set, bumping each row's version.
+
+        Core rather than ORM bulk UPDATE: a user deleted in the meantime is
+        skipped instead of failing the whole batch (StaleDataError).
+        """
+        groups: dict[tuple[str, ...], list[dict]] = {}
+        for user_id, fields in changes.items():
+            # executemany требует одинакового набора параметров — группируем по полям
+            groups.setdefault(tuple(sorted(fields)), []).append(
+                {"b_id": user_id, **{f"b_{name}": value for name, value in fields.items()}}
+            )
+        users = User.__table__
+        for names, params in groups.items():
+            await session.execute(
+                update(users)
+                .where(users.c.id == bindparam("b_id"))
+                .values(
+                    {name: bindparam(f"b_{name}") for name in names}
+                    | {"version": users.c.version + 1, "updated_at": func.now()}
+                ),
+                params,
+            )
+
+    async def apply_updates(self, session: AsyncSession, changes: dict[int, dict]) -> None:
+        """Write-behind batch: {user_id: fields} written in one transaction"""
+        try:
+            await self._update_many(session, changes)
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+    async def delete(self, session: AsyncSession, user_id: int, expected_versions: list[int] | None = None) -> bool:
+        """DELETE by id; returns whether a row was deleted. `expected_versions` works as in `update`"""
+        query = delete(User).where(User.id == user_id)
+        if isinstance(expected_versions, list):
+            query = query.where(User.version.in_(expected_versions))
+        result = await session.execute(query.returning(User.id))
+        deleted = result.first() is not None
+        await session.commit()
+        if not deleted and expected_versions is not None:
+            raise PreconditionFailedError()
+        return deleted
+
+    async def find_taken(
+        self,
+        session: AsyncSession,
+        usernames: set[str],
+        emails: set[str],
+    ) -> list[tuple[int, str, str]]:
+        """(id, username, email) of users holding any of the given usernames or emails, in one query"""
+        if not usernames and not emails:
+            return []
+        self._use_primary(session)
+        query = select(User.id, User.username, User.email).where(
+            or_(User.username.in_(usernames), User.email.in_(emails))
+        )
+        result = await session.execute(query)
+        return [tuple(row) for row in result]
+
+    async def get_existing_ids(self, session: AsyncSession, user_ids: set[int]) -> set[int]:
+        if not user_ids:
+            return set()
+        self._use_primary(session)
+        result = await session.execute(select(User.id).where(User.id.in_(user_ids)))
+        return set(result.scalars())
+
+    async def bulk_create(self, session: AsyncSession, items: list[UserCreate]) -> list[User]:
+        """Multi-row INSERT ... RETURNING of all items in one transaction"""
+        if not items:
+            return []
+        try:
+            result = await session.scalars(
+                insert(User).returning(User, sort_by_parameter_order=True),
+                [item.model_dump() for item in items],
+            )
+            users = list(result.all())
+            await session.commit()
+            return users
+        except IntegrityError as e:
+            await session.rollback()
+            if _is_unique_violation(e):
+                raise UserAlreadyExistsError() from e
+            raise
+
+    async def bulk_update(self, session: AsyncSession, items: list[dict]) -> list[User]:
+        """Partial updates in one transaction; each dict holds `id` plus the changed fields.
+
+        Returns the users actually updated, by id: one deleted since the caller
+        checked it is missing from the result instead of failing the batch.
+        """
+        if not items:
+            return []
+        changes = {item["id"]: {name: value for name, value in item.items() if name != "id"} for item in items}
+        try:
+            await self._update_many(session, changes)
+            # UPDATE ... RETURNING в executemany не поддерживают ни aiosqlite, ни драйверы PostgreSQL:
+            # читаем строки в той же транзакции до COMMIT — обновлённые строки заблокированы ею
+            result = await session.scalars(
+                select(User)
+                .where(User.id.in_(changes))
+                .order_by(User.id)
+                .execution_options(populate_existing=True)
+            )
+            users = list(result.all())
+            await session.commit()
+        except IntegrityError as e:
+            await session.rollback()
+            if _is_unique_violation(e):
+                raise UserAlreadyExistsError() from e
+            raise
+        return users
+
+    async def bulk_delete(self, session: AsyncSession, user_ids: set[int]) -> list[int]:
+        """Delete users by id in one statement; returns the ids actually deleted"""
+        if not user_ids:
+            return []
+        result = await session.execute(
+            delete(User).where(User.id.in_(user_ids)).returning(User.id)
+        )
+        deleted = list(result.scalars())
+        await session.commit()
+        return deleted
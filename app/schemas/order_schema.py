@@ -0,0 +1,47 @@
+from datetime import datetime
+
+import msgspec
+
+
+class ProductRead(msgspec.Struct):
+    id: int
+    title: str
+    price_cents: int
+
+
+class AddressRead(msgspec.Struct):
+    id: int
+    city: str
+    street: str
+
+
+class OrderRead(msgspec.Struct):
+    id: int
+    user_id: int
+    created_at: datetime
+    total_cents: int
+    shipping_address: AddressRead
+    products: list[ProductRead]
+
+
+class OrderSummary(msgspec.Struct):
+    id: int
+    user_id: int
+    created_at: datetime
+    total_cents: int
+
+
+class UserOrderStatsRead(msgspec.Struct):
+    user_id: int
+    order_count: int
+    total_spent_cents: int
+
+
+class OrderCreate(msgspec.Struct):
+    user_id: int
+    shipping_address_id: int
+    product_ids: list[int] = []
+
+
+class OrderProductsAdd(msgspec.Struct):
+    product_ids: list[int]
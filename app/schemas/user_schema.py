@@ -1,20 +1,121 @@
-from pydantic import BaseModel
+from datetime import datetime
+from functools import lru_cache
+from typing import Annotated
+
+import msgspec
+from pydantic import BaseModel, Field, field_validator
+
+# Длины столбцов users: SQLite их не проверяет, а PostgreSQL отклонил бы запись (при write-behind — всю пачку)
+Username = Annotated[str, Field(max_length=50)]
+Email = Annotated[str, Field(max_length=255)]
+FullName = Annotated[str, Field(max_length=100)]
 
 class UserBase(BaseModel):
-    username: str
-    email: str
-    full_name: str | None = None
+    username: Username
+    email: Email
+    full_name: FullName | None = None
 
 class UserCreate(UserBase):
     pass
 
 class UserUpdate(UserBase):
-    username: str | None = None
-    email: str | None = None
-    full_name: str | None = None
+    username: Username | None = None
+    email: Email | None = None
+    full_name: FullName | None = None
+
+    @field_validator("username", "email")
+    @classmethod
+    def _not_null(cls, value: str | None) -> str:
+        # Поле можно не передавать, но null нарушил бы NOT NULL в users
+        if value is None:
+            raise ValueError("must not be null")
+        return value
 
 class UserResponse(UserBase):
     id: int
+    version: int
+    updated_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class UserRead(msgspec.Struct):
+    """Read-only user built straight from a row tuple, without ORM or Pydantic.
+
+    Field order matches UserResponse so the JSON output is the same, and
+    repositories select columns in `__struct_fields__` order so a row can be
+    passed positionally: `UserRead(*row)`.
+    """
+    username: str
+    email: str
+    full_name: str | None
+    id: int
+    version: int
+    updated_at: datetime
+
+def to_user_read(user) -> UserRead:
+    """UserRead from an ORM User (or anything with its attributes); encoded by msgspec, not Pydantic"""
+    if isinstance(user, UserRead):
+        return user
+    return UserRead(*(getattr(user, field) for field in UserRead.__struct_fields__))
+
+# Ответ 202 на отложенное обновление: version и updated_at станут известны только после записи
+PENDING_USER_FIELDS = tuple(name for name in UserRead.__struct_fields__ if name not in ("version", "updated_at"))
+
+class UserPage(msgspec.Struct):
+    items: list[UserRead]
+    next_cursor: str | None = None
+
+
+_USER_READ_TYPES = {field.name: field.type for field in msgspec.structs.fields(UserRead)}
+
+
+def parse_user_fields(value: str | None) -> tuple[str, ...] | None:
+    """`fields=` of GET /users as UserRead fields in their declared order; None means all of them.
+
+    `id` is always included: the cursor and the client need it.
+    """
+    if value is None:
+        return None
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    if not requested:
+        raise ValueError("fields must name at least one user field")
+    unknown = requested - _USER_READ_TYPES.keys()
+    if unknown:
+        raise ValueError(f"Unknown user fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    fields = tuple(name for name in UserRead.__struct_fields__ if name in requested)
+    return None if fields == UserRead.__struct_fields__ else fields
+
+
+@lru_cache(maxsize=64)
+def user_projection(fields: tuple[str, ...]) -> type[msgspec.Struct]:
+    """UserRead narrowed to `fields` (as returned by parse_user_fields), one class per field set"""
+    # Как и UserRead, строится позиционно из строки: Projection(*row)
+    return msgspec.defstruct(
+        f"UserRead[{','.join(fields)}]",
+        [(name, _USER_READ_TYPES[name]) for name in fields],
+    )
+
+
+class UserBulkUpdate(UserBase):
+    """One item of PATCH /users/bulk; a null username/email is reported per item, not rejected"""
+    username: Username | None = None
+    email: Email | None = None
+    full_name: FullName | None = None
+    id: int
+
+
+class BulkItemError(msgspec.Struct):
+    index: int
+    detail: str
+
+
+class UserBulkResult(msgspec.Struct):
+    items: list[UserRead]
+    errors: list[BulkItemError]
+
+
+class UserBulkDeleteResult(msgspec.Struct):
+    deleted: list[int]
+    errors: list[BulkItemError]
\ No newline at end of file
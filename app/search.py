@@ -0,0 +1,101 @@
+"""Substring search over users: SQLite FTS5 (trigram) and PostgreSQL pg_trgm.
+
+Both backends answer "does username, full_name or email contain q" from an
+index instead of LIKE '%q%' over the whole table. Trigram indexes need at
+least three characters to look anything up, hence MIN_QUERY_LENGTH.
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy import DDL, Table, event, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+MIN_QUERY_LENGTH = 3
+
+# External content: FTS хранит только индекс, сами строки остаются в users
+SQLITE_SEARCH_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        username, full_name, email,
+        content='users', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts (rowid, username, full_name, email)
+        VALUES (new.id, new.username, new.full_name, new.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts (users_fts, rowid, username, full_name, email)
+        VALUES ('delete', old.id, old.username, old.full_name, old.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF username, full_name, email ON users BEGIN
+        INSERT INTO users_fts (users_fts, rowid, username, full_name, email)
+        VALUES ('delete', old.id, old.username, old.full_name, old.email);
+        INSERT INTO users_fts (rowid, username, full_name, email)
+        VALUES (new.id, new.username, new.full_name, new.email);
+    END
+    """,
+)
+SQLITE_SEARCH_DROP = ("DROP TABLE IF EXISTS users_fts",)
+_SQLITE_INSERT_TRIGGER = SQLITE_SEARCH_DDL[1]
+
+# Выражение индекса должно совпадать с USER_SEARCH_EXPRESSION в UserRepository
+POSTGRES_SEARCH_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX IF NOT EXISTS ix_users_search_trgm ON users
+    USING gin ((username || ' ' || coalesce(full_name, '') || ' ' || email) gin_trgm_ops)
+    """,
+)
+POSTGRES_SEARCH_DROP = ("DROP INDEX IF EXISTS ix_users_search_trgm",)
+
+
+def fts5_phrase(q: str) -> str:
+    """Quote user input as a single FTS5 phrase so its operators are matched literally"""
+    return '"' + q.replace('"', '""') + '"'
+
+
+def install_search_ddl(table: Table) -> None:
+    """Create/drop the search index together with the table in metadata.create_all/drop_all"""
+    for statement in SQLITE_SEARCH_DDL:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in POSTGRES_SEARCH_DDL:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in SQLITE_SEARCH_DROP:
+        event.listen(table, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in POSTGRES_SEARCH_DROP:
+        event.listen(table, "before_drop", DDL(statement).execute_if(dialect="postgresql"))
+
+
+@asynccontextmanager
+async def deferred_search_index(conn: AsyncConnection, first_user_id: int) -> AsyncIterator[None]:
+    """Index users inserted inside the block with one INSERT ... SELECT instead of a trigger per row.
+
+    Must run inside the loading transaction: SQLite DDL is transactional, so a
+    failed load rolls the dropped trigger back too, and no other writer can
+    insert users while the transaction holds the write lock.
+    """
+    if conn.dialect.name != "sqlite":
+        yield
+        return
+    trigger = await conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'users_fts_ai'")
+    )
+    if trigger.first() is None:
+        yield
+        return
+    await conn.exec_driver_sql("DROP TRIGGER users_fts_ai")
+    yield
+    await conn.execute(
+        text(
+            "INSERT INTO users_fts (rowid, username, full_name, email) "
+            "SELECT id, username, full_name, email FROM users WHERE id >= :first_id"
+        ),
+        {"first_id": first_user_id},
+    )
+    await conn.exec_driver_sql(_SQLITE_INSERT_TRIGGER)
@@ -0,0 +1,63 @@
+"""Run the API with several worker processes behind one listening socket.
+
+uvicorn's supervisor binds the socket and spawns the workers. Each worker
+imports `app.main:create_app` and opens its own engine in the lifespan
+startup, so no connection pool is inherited across processes; the loader
+is per worker too. The user cache lives in process memory and a write
+invalidates it only in the worker that made it, so with more than one
+worker it is turned off (USER_CACHE_SIZE=0).
+
+Usage:
+    python -m app.serve --workers 4 --port 8000
+    WEB_CONCURRENCY=0 python -m app.serve    # one worker per CPU core
+"""
+import argparse
+import logging
+import os
+
+import uvicorn
+
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_workers(workers: int) -> int:
+    return workers if workers > 0 else os.cpu_count() or 1
+
+
+def main(argv: list[str] | None = None) -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(prog="python -m app.serve", description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument("--workers", type=int, default=settings.workers, help="0 = one per CPU core")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--no-access-log", action="store_true")
+    args = parser.parse_args(argv)
+
+    workers = resolve_workers(args.workers)
+    # У каждого процесса была бы своя пустая база в памяти
+    if workers > 1 and settings.is_sqlite_memory:
+        parser.error("an in-memory SQLite database cannot be shared between workers")
+    # Другие воркеры не узнают об изменении и отдавали бы устаревшую запись и ETag (а на If-Match с ним — 412);
+    # общего бэкенда кэша нет, поэтому кэш выключается в воркерах через окружение
+    if workers > 1 and settings.user_cache_size > 0:
+        if "USER_CACHE_SIZE" in os.environ:
+            logger.warning("USER_CACHE_SIZE=%d ignored: the in-process user cache is disabled with %d workers",
+                           settings.user_cache_size, workers)
+        os.environ["USER_CACHE_SIZE"] = "0"
+
+    uvicorn.run(
+        "app.main:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        log_level=args.log_level,
+        access_log=not args.no_access_log,
+    )
+
+
+if __name__ == "__main__":
+    main()
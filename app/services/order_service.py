@@ -0,0 +1,47 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.order_repository import OrderRepository, LoadStrategy
+from app.schemas.order_schema import OrderRead, OrderSummary, UserOrderStatsRead
+
+class OrderService:
+    def __init__(self, order_repository: OrderRepository):
+        self.order_repository = order_repository
+
+    async def get_by_id(
+        self,
+        session: AsyncSession,
+        order_id: int,
+        strategy: LoadStrategy = "joined",
+    ) -> OrderRead | None:
+        return await self.order_repository.get_by_id(session, order_id, strategy)
+
+    async def get_by_filter(
+        self,
+        session: AsyncSession,
+        count: int = 10,
+        page: int = 1,
+        strategy: LoadStrategy = "selectin",
+        user_id: int | None = None,
+    ) -> list[OrderRead]:
+        return await self.order_repository.get_by_filter(session, count, page, strategy, user_id=user_id)
+
+    async def get_top(self, session: AsyncSession, n: int = 10) -> list[OrderSummary]:
+        return await self.order_repository.get_top(session, n)
+
+    async def get_user_stats(self, session: AsyncSession, user_id: int) -> UserOrderStatsRead | None:
+        return await self.order_repository.get_user_stats(session, user_id)
+
+    async def create(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        shipping_address_id: int,
+        product_ids: list[int],
+    ) -> OrderRead:
+        order_id = await self.order_repository.create(session, user_id, shipping_address_id, product_ids)
+        return await self.order_repository.get_by_id(session, order_id)
+
+    async def add_products(self, session: AsyncSession, order_id: int, product_ids: list[int]) -> OrderRead | None:
+        if not await self.order_repository.add_products(session, order_id, product_ids):
+            return None
+        return await self.order_repository.get_by_id(session, order_id)
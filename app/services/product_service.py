@@ -0,0 +1,11 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.product_repository import ProductRepository
+from app.schemas.order_schema import ProductRead
+
+class ProductService:
+    def __init__(self, product_repository: ProductRepository):
+        self.product_repository = product_repository
+
+    async def get_by_filter(self, session: AsyncSession, count: int = 10, page: int = 1) -> list[ProductRead]:
+        return await self.product_repository.get_by_filter(session, count, page)
@@ -1,30 +1,240 @@
+from typing import Iterable
+
+import msgspec
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.loader import DataLoader
+from app.replicas import mark_request_wrote, reads_pinned_to_primary
 from app.repositories.user_repository import UserRepository
-from app.schemas.user_schema import UserCreate, UserUpdate
+from app.schemas.user_schema import UserCreate, UserUpdate, UserRead, UserBulkUpdate, BulkItemError
 from app.models.user import User
+from app.pagination import encode_cursor, decode_cursor
+from app.search import MIN_QUERY_LENGTH
+from app.totals import CachedTotal, Total
+from app.write_behind import WriteBehindQueue
+
+BULK_MAX_ITEMS = 10_000
+
+# Поля без уникальных индексов: конфликт (409) по ним невозможен, их запись можно отложить
+WRITE_BEHIND_FIELDS = frozenset({"full_name"})
 
 class UserService:
-    def __init__(self, user_repository: UserRepository):
+    """One instance per app; the request's session is passed to every method"""
+
+    def __init__(
+        self,
+        user_repository: UserRepository,
+        user_loader: DataLoader[int, UserRead] | None = None,
+        write_behind: WriteBehindQueue[int] | None = None,
+        user_total: CachedTotal | None = None,
+    ):
         self.user_repository = user_repository
+        self.user_loader = user_loader
+        self.write_behind = write_behind
+        self.user_total = user_total
+
+    def _use_loader(self) -> bool:
+        # Батч загрузчика общий для разных клиентов и может уйти на реплику
+        return self.user_loader is not None and not reads_pinned_to_primary()
+
+    async def get_by_id(self, session: AsyncSession, user_id: int) -> UserRead | None:
+        # Конкурентные запросы за пользователями сливаются в один WHERE id IN (...)
+        if self._use_loader():
+            return await self.user_loader.load(user_id)
+        return await self.user_repository.get_read_by_id(session, user_id)
+
+    async def get_by_filter(
+        self,
+        session: AsyncSession,
+        count: int = 10,
+        page: int = 1,
+        fields: tuple[str, ...] | None = None,
+        **kwargs,
+    ) -> list[UserRead]:
+        """A page of users; `fields` (see parse_user_fields) narrows the SELECT and the items"""
+        return await self.user_repository.get_read_by_filter(session, count, page, fields, **kwargs)
+
+    async def get_total(self, session: AsyncSession) -> Total:
+        """Number of users: exact for a small table, cached with its age for a large one"""
+        if self.user_total is not None:
+            return await self.user_total.get()
+        return Total(await self.user_repository.count(session), True, 0.0)
+
+    def _count_added(self, n: int) -> None:
+        if self.user_total is not None and n:
+            self.user_total.add(n)
+
+    async def search(self, session: AsyncSession, q: str, limit: int = 20) -> list[UserRead]:
+        q = q.strip()
+        if len(q) < MIN_QUERY_LENGTH:
+            raise ValueError(f"Search query must be at least {MIN_QUERY_LENGTH} characters")
+        return await self.user_repository.search(session, q, limit)
+
+    async def get_page(
+        self,
+        session: AsyncSession,
+        count: int = 10,
+        cursor: str = "",
+        fields: tuple[str, ...] | None = None,
+        **kwargs,
+    ) -> tuple[list[UserRead], str | None]:
+        """Keyset pagination over users.id; returns the page and the next cursor"""
+        after_id = decode_cursor(cursor)
+        # Берём на одну запись больше, чтобы понять, есть ли следующая страница
+        users = await self.user_repository.get_after_id(session, after_id, count + 1, fields, **kwargs)
+        if len(users) <= count:
+            return users, None
+        users = users[:count]
+        return users, encode_cursor(users[-1].id)
 
-    async def get_by_id(self, user_id: int) -> User | None:
-        return await self.user_repository.get_by_id(user_id)
+    async def create(self, session: AsyncSession, user_data: UserCreate) -> User:
+        # Дубликаты username/email отсекают уникальные индексы при INSERT,
+        # репозиторий превращает IntegrityError в UserAlreadyExistsError
+        user = await self.user_repository.create(session, user_data)
+        self._count_added(1)
+        return user
 
-    async def get_by_filter(self, count: int = 10, page: int = 1, **kwargs) -> list[User]:
-        return await self.user_repository.get_by_filter(count, page, **kwargs)
+    def defers(self, user_data: UserUpdate, expected_versions: list[int] | None = None) -> bool:
+        """Whether `update` acknowledges this change now and writes it in the background.
 
-    async def create(self, user_data: UserCreate) -> User:
-        # Проверяем, что пользователь с таким username или email не существует
-        existing_users = await self.user_repository.get_by_filter(
-            username=user_data.username,
-            email=user_data.email
+        Only for the write-behind mode, and only for changes to non-unique
+        fields without If-Match: a 409 or 412 must come from a synchronous write.
+        """
+        if self.write_behind is None or not self.write_behind.accepting or expected_versions is not None:
+            return False
+        fields = user_data.model_fields_set
+        return bool(fields) and fields <= WRITE_BEHIND_FIELDS
+
+    async def _flush_pending(self, user_ids: Iterable[int]) -> None:
+        # Отложенные изменения пишем до синхронной записи, иначе они легли бы поверх неё
+        if self.write_behind is not None:
+            await self.write_behind.flush_keys(user_ids)
+
+    async def update(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        user_data: UserUpdate,
+        expected_versions: list[int] | None = None,
+    ) -> User | UserRead | None:
+        """Update a user; in write-behind mode (see `defers`) returns the expected state without waiting for the write"""
+        if self.defers(user_data, expected_versions):
+            current = await self.get_by_id(session, user_id)
+            if current is None:
+                return None
+            changes = user_data.model_dump(exclude_unset=True)
+            await self.write_behind.submit(user_id, changes)
+            # В БД запрос не писал, но после записи клиент должен читать её с primary
+            mark_request_wrote()
+            # version и updated_at здесь ещё прежние: новые станут известны только после записи
+            return msgspec.structs.replace(current, **changes)
+        await self._flush_pending([user_id])
+        return await self.user_repository.update(session, user_id, user_data, expected_versions)
+
+    async def delete(self, session: AsyncSession, user_id: int, expected_versions: list[int] | None = None) -> None:
+        await self._flush_pending([user_id])
+        if await self.user_repository.delete(session, user_id, expected_versions):
+            self._count_added(-1)
+
+    @staticmethod
+    def _check_bulk_size(items: list) -> None:
+        if len(items) > BULK_MAX_ITEMS:
+            raise ValueError(f"At most {BULK_MAX_ITEMS} items per bulk request")
+
+    async def bulk_create(
+        self,
+        session: AsyncSession,
+        items: list[UserCreate],
+    ) -> tuple[list[User], list[BulkItemError]]:
+        """Create valid items in one transaction, report duplicates per item"""
+        self._check_bulk_size(items)
+        taken = await self.user_repository.find_taken(session, 
+            {item.username for item in items}, {item.email for item in items}
         )
-        if existing_users:
-            raise ValueError("User with this username or email already exists")
-        
-        return await self.user_repository.create(user_data)
+        usernames = {username for _, username, _ in taken}
+        emails = {email for _, _, email in taken}
+
+        errors = []
+        valid = []
+        for index, item in enumerate(items):
+            if item.username in usernames or item.email in emails:
+                errors.append(BulkItemError(index=index, detail="User with this username or email already exists"))
+                continue
+            # Повторы внутри самой пачки тоже считаем дубликатами
+            usernames.add(item.username)
+            emails.add(item.email)
+            valid.append(item)
 
-    async def update(self, user_id: int, user_data: UserUpdate) -> User:
-        return await self.user_repository.update(user_id, user_data)
+        users = await self.user_repository.bulk_create(session, valid)
+        self._count_added(len(users))
+        return users, errors
+
+    async def bulk_update(
+        self,
+        session: AsyncSession,
+        items: list[UserBulkUpdate],
+    ) -> tuple[list[User], list[BulkItemError]]:
+        """Apply partial updates in one transaction, report missing users and duplicates per item"""
+        self._check_bulk_size(items)
+        await self._flush_pending({item.id for item in items})
+        changes = [item.model_dump(exclude_unset=True) for item in items]
+        existing = await self.user_repository.get_existing_ids(session, {item.id for item in items})
+        taken = await self.user_repository.find_taken(session, 
+            {change["username"] for change in changes if change.get("username")},
+            {change["email"] for change in changes if change.get("email")},
+        )
+        usernames = {username: user_id for user_id, username, _ in taken}
+        emails = {email: user_id for user_id, _, email in taken}
+
+        errors = []
+        valid = []
+        valid_indexes = []
+        seen_ids = set()
+        for index, (item, change) in enumerate(zip(items, changes)):
+            if item.id not in existing:
+                errors.append(BulkItemError(index=index, detail=f"User with ID {item.id} not found"))
+                continue
+            if any(change.get(name, "") is None for name in ("username", "email")):
+                errors.append(BulkItemError(index=index, detail="username and email must not be null"))
+                continue
+            if item.id in seen_ids:
+                errors.append(BulkItemError(index=index, detail=f"User with ID {item.id} is repeated in the batch"))
+                continue
+            if len(change) == 1:
+                errors.append(BulkItemError(index=index, detail="No fields to update"))
+                continue
+            username, email = change.get("username"), change.get("email")
+            if usernames.get(username, item.id) != item.id or emails.get(email, item.id) != item.id:
+                errors.append(BulkItemError(index=index, detail="User with this username or email already exists"))
+                continue
+            seen_ids.add(item.id)
+            if username:
+                usernames[username] = item.id
+            if email:
+                emails[email] = item.id
+            valid.append(change)
+            valid_indexes.append(index)
+
+        users = await self.user_repository.bulk_update(session, valid)
+        # Удалённые после проверки existing пользователи в UPDATE не попали
+        updated = {user.id for user in users}
+        errors.extend(
+            BulkItemError(index=index, detail=f"User with ID {change['id']} not found")
+            for index, change in zip(valid_indexes, valid)
+            if change["id"] not in updated
+        )
+        errors.sort(key=lambda error: error.index)
+        return users, errors
 
-    async def delete(self, user_id: int) -> None:
-        await self.user_repository.delete(user_id)
\ No newline at end of file
+    async def bulk_delete(self, session: AsyncSession, user_ids: list[int]) -> tuple[list[int], list[BulkItemError]]:
+        """Delete users in one statement, report ids that did not exist"""
+        self._check_bulk_size(user_ids)
+        await self._flush_pending(user_ids)
+        deleted = set(await self.user_repository.bulk_delete(session, set(user_ids)))
+        self._count_added(-len(deleted))
+        errors = [
+            BulkItemError(index=index, detail=f"User with ID {user_id} not found")
+            for index, user_id in enumerate(user_ids)
+            if user_id not in deleted
+        ]
+        return sorted(deleted), errors
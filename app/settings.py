@@ -0,0 +1,140 @@
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+from sqlalchemy.engine import make_url
+
+# Асинхронный драйвер -> синхронный для db.py и Alembic
+_SYNC_DRIVERS = {
+    "sqlite+aiosqlite": "sqlite",
+    "postgresql+asyncpg": "postgresql+psycopg",
+    "postgresql+psycopg_async": "postgresql+psycopg",
+}
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Application settings, read from environment variables by `from_env`"""
+
+    database_url: str = "sqlite+aiosqlite:///mydb.sqlite3"
+    echo: bool = False
+
+    # Реплики только для чтения (DATABASE_REPLICA_URLS через запятую); пусто — всё идёт на primary
+    database_replica_urls: tuple[str, ...] = ()
+    replica_policy: str = "round_robin"
+    # Сколько секунд после записи клиент читает с primary
+    read_your_writes_seconds: float = 5.0
+
+    # Пул соединений (не применяется к SQLite :memory:)
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+
+    # PRAGMA, выполняемые на каждом новом соединении SQLite
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+
+    user_cache_size: int = 1024
+    user_cache_ttl: float = 30.0
+
+    # Батчинг GET /users/{id}: 0 отключает, задержка 0 — в пределах одной итерации цикла событий
+    user_loader_max_batch: int = 500
+    user_loader_delay_ms: float = 0.0
+
+    # Отложенная запись PUT /users/{id} (только full_name, без If-Match): 0 отключает
+    user_write_behind_max_batch: int = 0
+    user_write_behind_interval_ms: float = 50.0
+    # Сколько разных пользователей может ждать записи; дальше PUT ждёт (backpressure)
+    user_write_behind_max_pending: int = 10_000
+
+    # Число пользователей (include_total): до порога — COUNT(*) на запрос, выше — кэш,
+    # пересчитываемый в фоне, когда он старше USER_COUNT_MAX_AGE секунд
+    user_count_exact_threshold: int = 10_000
+    user_count_max_age: float = 60.0
+
+    # Сжатие ответов: gzip, brotli (нужен пакет brotli) или off; ответы меньше порога не сжимаются.
+    # Уровень gzip 1: страница из 1000 пользователей сжимается в 6.8 раза против 9 у уровня 9, но в 5 раз быстрее
+    response_compression: str = "gzip"
+    compression_minimum_size: int = 1024
+    gzip_compress_level: int = 1
+    brotli_quality: int = 4
+
+    metrics_enabled: bool = False
+
+    # Запуск через python -m app.serve; WEB_CONCURRENCY=0 — по воркеру на ядро
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 1
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(
+            database_url=os.getenv("DATABASE_URL", cls.database_url),
+            echo=_env_bool("DB_ECHO", cls.echo),
+            database_replica_urls=tuple(
+                url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+            ),
+            replica_policy=os.getenv("DB_REPLICA_POLICY", cls.replica_policy),
+            read_your_writes_seconds=float(os.getenv("READ_YOUR_WRITES_SECONDS", cls.read_your_writes_seconds)),
+            pool_size=int(os.getenv("DB_POOL_SIZE", cls.pool_size)),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", cls.max_overflow)),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", cls.pool_timeout)),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", cls.pool_recycle)),
+            pool_pre_ping=_env_bool("DB_POOL_PRE_PING", cls.pool_pre_ping),
+            sqlite_journal_mode=os.getenv("SQLITE_JOURNAL_MODE", cls.sqlite_journal_mode),
+            sqlite_synchronous=os.getenv("SQLITE_SYNCHRONOUS", cls.sqlite_synchronous),
+            sqlite_busy_timeout_ms=int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", cls.sqlite_busy_timeout_ms)),
+            sqlite_mmap_size=int(os.getenv("SQLITE_MMAP_SIZE", cls.sqlite_mmap_size)),
+            user_cache_size=int(os.getenv("USER_CACHE_SIZE", cls.user_cache_size)),
+            user_cache_ttl=float(os.getenv("USER_CACHE_TTL", cls.user_cache_ttl)),
+            user_loader_max_batch=int(os.getenv("USER_LOADER_MAX_BATCH", cls.user_loader_max_batch)),
+            user_loader_delay_ms=float(os.getenv("USER_LOADER_DELAY_MS", cls.user_loader_delay_ms)),
+            user_write_behind_max_batch=int(os.getenv("USER_WRITE_BEHIND_MAX_BATCH", cls.user_write_behind_max_batch)),
+            user_write_behind_interval_ms=float(
+                os.getenv("USER_WRITE_BEHIND_INTERVAL_MS", cls.user_write_behind_interval_ms)
+            ),
+            user_write_behind_max_pending=int(
+                os.getenv("USER_WRITE_BEHIND_MAX_PENDING", cls.user_write_behind_max_pending)
+            ),
+            user_count_exact_threshold=int(os.getenv("USER_COUNT_EXACT_THRESHOLD", cls.user_count_exact_threshold)),
+            user_count_max_age=float(os.getenv("USER_COUNT_MAX_AGE", cls.user_count_max_age)),
+            response_compression=os.getenv("RESPONSE_COMPRESSION", cls.response_compression).strip().lower(),
+            compression_minimum_size=int(os.getenv("COMPRESSION_MINIMUM_SIZE", cls.compression_minimum_size)),
+            gzip_compress_level=int(os.getenv("GZIP_COMPRESS_LEVEL", cls.gzip_compress_level)),
+            brotli_quality=int(os.getenv("BROTLI_QUALITY", cls.brotli_quality)),
+            metrics_enabled=_env_bool("METRICS_ENABLED", cls.metrics_enabled),
+            host=os.getenv("HOST", cls.host),
+            port=int(os.getenv("PORT", cls.port)),
+            workers=int(os.getenv("WEB_CONCURRENCY", cls.workers)),
+        )
+
+    @property
+    def sync_database_url(self) -> str:
+        url = make_url(self.database_url)
+        drivername = _SYNC_DRIVERS.get(url.drivername, url.drivername)
+        return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+    @property
+    def is_sqlite(self) -> bool:
+        return make_url(self.database_url).get_backend_name() == "sqlite"
+
+    @property
+    def is_sqlite_memory(self) -> bool:
+        url = make_url(self.database_url)
+        return self.is_sqlite and url.database in (None, "", ":memory:")
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings.from_env()
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, NamedTuple
+
+CountFn = Callable[[], Awaitable[int]]
+EstimateFn = Callable[[], Awaitable[int | None]]
+
+logger = logging.getLogger(__name__)
+
+
+class Total(NamedTuple):
+    value: int
+    # True — COUNT(*) выполнен для этого ответа
+    exact: bool
+    # Секунд с начала последнего точного подсчёта; None — оценка по статистике планировщика
+    age: float | None
+
+
+class CachedTotal:
+    """Row count of one table without a COUNT(*) on every request.
+
+    While the last known count is below `exact_threshold`, `get()` counts
+    exactly (concurrent callers share one COUNT). Above it the last count is
+    served, adjusted by `add(n)` for the app's own inserts and deletes. Once
+    it is older than `max_age` seconds one background recount refreshes it,
+    which also picks up writes by other workers or outside the app; past
+    twice `max_age` the caller waits for the recount, so a served value is
+    never older than that. Before the first count of a large table
+    `estimate_fn` (planner statistics) answers instead.
+    """
+
+    def __init__(
+        self,
+        count_fn: CountFn,
+        estimate_fn: EstimateFn | None = None,
+        exact_threshold: int = 10_000,
+        max_age: float = 60.0,
+    ):
+        self.count_fn = count_fn
+        self.estimate_fn = estimate_fn
+        self.exact_threshold = exact_threshold
+        self.max_age = max_age
+        self._value: int | None = None
+        self._counted_at = 0.0
+        self._counting: asyncio.Task | None = None
+        self.counts = 0
+        self.cached = 0
+        self.estimated = 0
+
+    async def get(self) -> Total:
+        if self._value is None and self.estimate_fn is not None:
+            estimate = await self.estimate_fn()
+            if estimate is not None and estimate >= self.exact_threshold and self._value is None:
+                self._recount_in_background()
+                self.estimated += 1
+                return Total(estimate, False, None)
+        if self._value is None or self._value < self.exact_threshold:
+            return Total(await self._count(), True, 0.0)
+
+        age = time.monotonic() - self._counted_at
+        if age > 2 * self.max_age:
+            await self._count()
+            return Total(self._value, True, 0.0)
+        if age > self.max_age:
+            self._recount_in_background()
+        self.cached += 1
+        return Total(self._value, False, age)
+
+    def add(self, n: int) -> None:
+        """Account for `n` rows inserted (negative — deleted) and committed by this process"""
+        # Запись, попавшая в окно идущего подсчёта, может учесться дважды или потеряться;
+        # ошибка ограничена записями за время одного COUNT и исчезает при следующем
+        if self._value is not None:
+            self._value = max(self._value + n, 0)
+
+    async def _count(self) -> int:
+        if self._counting is None:
+            self._start_count()
+        # shield: отмена одного запроса не должна отменять общий подсчёт
+        return await asyncio.shield(self._counting)
+
+    def _recount_in_background(self) -> None:
+        if self._counting is None:
+            self._start_count()
+
+    def _start_count(self) -> None:
+        self._counting = asyncio.get_running_loop().create_task(self._run_count())
+        self._counting.add_done_callback(self._log_failure)
+
+    async def _run_count(self) -> int:
+        started = time.monotonic()
+        try:
+            value = await self.count_fn()
+        finally:
+            self._counting = None
+        # Значение не старше начала подсчёта — от него и отсчитываем возраст
+        self._value = value
+        self._counted_at = started
+        self.counts += 1
+        return value
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Row count failed", exc_info=task.exception())
+
+    async def close(self) -> None:
+        """Cancel a recount still running, e.g. before the engine is disposed"""
+        counting = self._counting
+        if counting is not None:
+            counting.cancel()
+            try:
+                await counting
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "value": self._value if self._value is not None else -1,
+            "age_seconds": time.monotonic() - self._counted_at if self._value is not None else -1,
+            "counts": self.counts,
+            "cached": self.cached,
+            "estimated": self.estimated,
+        }
+
+
+def total_headers(total: Total) -> dict[str, str]:
+    """X-Total-Count plus how fresh it is: exact, or cached `age` seconds ago / estimated"""
+    headers = {
+        "X-Total-Count": str(total.value),
+        "X-Total-Count-Exact": "true" if total.exact else "false",
+    }
+    if total.age is not None:
+        headers["X-Total-Count-Age"] = str(int(total.age))
+    return headers
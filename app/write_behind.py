@@ -0,0 +1,185 @@
+import asyncio
+import logging
+from itertools import islice
+from typing import Awaitable, Callable, Generic, Hashable, Iterable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+FlushFn = Callable[[dict[K, dict]], Awaitable[None]]
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue(Generic[K]):
+    """Accepts partial updates now and writes them in batches in the background.
+
+    `submit(key, changes)` merges `changes` into whatever is still pending for
+    `key`, so a burst of updates to one row costs one write. A single worker
+    task waits up to `interval` seconds after the first pending key (less if
+    `max_batch_size` keys are pending) and passes the batch to
+    `flush_fn({key: changes})`, which writes it in one transaction.
+
+    At most `max_pending` distinct keys wait in the asyncio queue; further
+    submits block until the worker frees space (backpressure). `close()`
+    stops accepting updates and drains everything still pending.
+
+    A batch that still fails after `retries` retries is written again row by
+    row, so only the rows the database rejects are dropped.
+    """
+
+    def __init__(
+        self,
+        flush_fn: FlushFn,
+        max_batch_size: int = 500,
+        interval: float = 0.05,
+        max_pending: int = 10_000,
+        retries: int = 2,
+    ):
+        self.flush_fn = flush_fn
+        self.max_batch_size = max_batch_size
+        self.interval = interval
+        self.retries = retries
+        # В очереди только ключи; сами изменения копятся в _changes, там же и сливаются
+        self._queue: asyncio.Queue[K | None] = asyncio.Queue(maxsize=max_pending)
+        self._changes: dict[K, dict] = {}
+        self._batch_ready = asyncio.Event()
+        # Ключ -> событие окончания записи пачки, в которой он сейчас пишется
+        self._in_flight: dict[K, asyncio.Event] = {}
+        self._worker: asyncio.Task | None = None
+        self._closing = False
+        self.submitted = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.written = 0
+        self.dropped = 0
+
+    @property
+    def accepting(self) -> bool:
+        return not self._closing
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, key: K, changes: dict) -> None:
+        if self._closing:
+            raise RuntimeError("Write-behind queue is closed")
+        self.submitted += 1
+        pending = self._changes.get(key)
+        if pending is not None:
+            pending.update(changes)
+            self.coalesced += 1
+            return
+        self._changes[key] = dict(changes)
+        # Очередь полна — ждём, пока воркер не запишет очередную пачку
+        await self._queue.put(key)
+        if self._queue.qsize() >= self.max_batch_size:
+            self._batch_ready.set()
+
+    async def flush_keys(self, keys: Iterable[K]) -> None:
+        """Write the pending changes of `keys` now, before the caller writes them synchronously.
+
+        Also waits for a batch that is writing any of them right now, so an
+        accepted update never lands after a later synchronous write.
+        """
+        keys = list(keys)
+        for key in keys:
+            flushed = self._in_flight.get(key)
+            if flushed is not None:
+                await flushed.wait()
+        # Ключи остаются в asyncio-очереди, воркер их пропустит
+        batch = {key: self._changes.pop(key) for key in keys if key in self._changes}
+        if batch:
+            await self._flush(batch)
+
+    async def _run(self) -> None:
+        while True:
+            key = await self._queue.get()
+            if key is None:
+                await self._drain()
+                return
+            if not self._closing:
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._batch_ready.clear()
+
+            keys = [key]
+            while len(keys) < self.max_batch_size and not self._queue.empty():
+                next_key = self._queue.get_nowait()
+                if next_key is None:
+                    # close(): дописываем эту пачку, сигнал вернём в конец очереди
+                    self._queue.put_nowait(None)
+                    break
+                keys.append(next_key)
+            batch = {key: self._changes.pop(key) for key in keys if key in self._changes}
+            if batch:
+                await self._flush(batch)
+
+    async def _flush(self, batch: dict[K, dict]) -> None:
+        flushed = asyncio.Event()
+        for key in batch:
+            self._in_flight[key] = flushed
+        try:
+            if await self._write(batch, self.retries) or len(batch) == 1:
+                return
+            # Пачка не записалась: пишем по одной строке, чтобы потерять только те, что отклоняет БД
+            for key, changes in batch.items():
+                await self._write({key: changes}, retries=0)
+        finally:
+            for key in batch:
+                if self._in_flight.get(key) is flushed:
+                    del self._in_flight[key]
+            flushed.set()
+
+    async def _write(self, batch: dict[K, dict], retries: int) -> bool:
+        error = None
+        for attempt in range(retries + 1):
+            try:
+                await self.flush_fn(batch)
+            except Exception as e:
+                error = e
+                if attempt < retries:
+                    await asyncio.sleep(self.interval * 2 ** attempt)
+            else:
+                self.batches += 1
+                self.written += len(batch)
+                return True
+        if len(batch) == 1:
+            self.dropped += 1
+            logger.error("Write-behind changes for %r dropped", next(iter(batch)), exc_info=error)
+        else:
+            logger.warning("Write-behind batch of %d rows failed, writing it row by row", len(batch), exc_info=error)
+        return False
+
+    async def _drain(self) -> None:
+        while True:
+            # Освобождаем место: submit, ждавшие в put(), завершатся, их изменения уже в _changes
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            if not self._changes:
+                return
+            keys = list(islice(self._changes, self.max_batch_size))
+            await self._flush({key: self._changes.pop(key) for key in keys})
+
+    async def close(self) -> None:
+        """Stop accepting updates and write everything still pending"""
+        if self._closing:
+            return
+        self._closing = True
+        if self._worker is None:
+            return
+        self._batch_ready.set()
+        await self._queue.put(None)
+        await self._worker
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "written": self.written,
+            "dropped": self.dropped,
+            "pending": len(self._changes),
+        }
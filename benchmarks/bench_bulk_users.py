@@ -0,0 +1,50 @@
+"""Throughput of per-row POST /users vs POST /users/bulk.
+
+Runs the Litestar app in-process against a fresh SQLite file.
+
+Usage: python -m benchmarks.bench_bulk_users [users] [batch_size]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+
+from litestar.testing import AsyncTestClient
+
+from app.main import app
+from app.models.user import Base
+
+
+def payload(prefix: str, i: int) -> dict:
+    return {"username": f"{prefix}{i}", "email": f"{prefix}{i}@example.com", "full_name": f"User {i}"}
+
+
+async def main(users: int, batch_size: int) -> None:
+    async with AsyncTestClient(app) as client:
+        async with app.state.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        started = time.perf_counter()
+        for i in range(users):
+            response = await client.post("/users", json=payload("row", i))
+            assert response.status_code == 201, response.text
+        per_row = users / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for start in range(0, users, batch_size):
+            batch = [payload("bulk", i) for i in range(start, min(start + batch_size, users))]
+            response = await client.post("/users/bulk", json=batch)
+            assert response.status_code == 201 and not response.json()["errors"], response.text
+        bulk = users / (time.perf_counter() - started)
+
+    print(f"per-row POST /users:    {per_row:>10.0f} users/s")
+    print(f"POST /users/bulk ({batch_size}): {bulk:>10.0f} users/s  (x{bulk / per_row:.1f})")
+
+
+if __name__ == "__main__":
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    asyncio.run(main(users, batch_size))
@@ -0,0 +1,159 @@
+"""GET /users page size vs encode time and bytes on the wire.
+
+Part 1 encodes a page of users read from the database two ways: the old
+Pydantic path (UserResponse.model_validate -> model_dump -> JSON, what the
+Pydantic plugin does for handlers returning UserResponse) and msgspec
+straight from UserRead structs, then compresses the body with gzip at
+several levels and brotli (if the brotli package is installed).
+
+Part 2 requests GET /users?count=N through the app with and without
+`Accept-Encoding: gzip` and reports latency and the body size sent.
+
+Usage: python -m benchmarks.bench_compression [rows]
+"""
+import asyncio
+import gzip
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ["USER_CACHE_SIZE"] = "0"
+
+import msgspec
+
+from app.main import app as asgi_app
+from app.models.user import Base
+from app.repositories.user_repository import UserRepository
+from app.schemas.user_schema import UserResponse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PAGE_SIZES = (10, 100, 1000)
+REPEATS = 50
+
+
+def seed(rows: int) -> None:
+    from sqlalchemy import create_engine
+    Base.metadata.create_all(create_engine(f"sqlite:///{DB_PATH}"))
+    first_names = ("Ivan", "Maria", "Olga", "Petr", "Anna", "Sergey", "Elena", "Dmitry")
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.executemany(
+            "INSERT INTO users (id, username, email, full_name) VALUES (?, ?, ?, ?)",
+            (
+                (i, f"{first_names[i % 8].lower()}_{i * 7919 % 100_003}", f"u{i * 104_729 % 1_000_003}@example.com",
+                 f"{first_names[i % 8]} {first_names[i * 3 % 8]}ov {i}")
+                for i in range(1, rows + 1)
+            ),
+        )
+
+
+def timed_us(fn) -> tuple[float, object]:
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        result = fn()
+    return (time.perf_counter() - started) / REPEATS * 1_000_000, result
+
+
+def compressors() -> list[tuple[str, object]]:
+    variants = [(f"gzip-{level}", lambda body, level=level: gzip.compress(body, level)) for level in (1, 6, 9)]
+    if brotli is not None:
+        variants += [
+            (f"br-{quality}", lambda body, quality=quality: brotli.compress(body, quality=quality))
+            for quality in (4, 11)
+        ]
+    return variants
+
+
+async def encode_and_compress() -> None:
+    encoder = msgspec.json.Encoder()
+    async with asgi_app.state.session_factory() as session:
+        pages = {n: await UserRepository().get_read_by_filter(session, count=n, page=1) for n in PAGE_SIZES}
+    print(f"{'page':>6} {'pydantic, us':>13} {'msgspec, us':>12} {'json, B':>8}  compressed B / us")
+    for n, users in pages.items():
+        pydantic_us, _ = timed_us(
+            lambda: encoder.encode([UserResponse.model_validate(user).model_dump(mode="json") for user in users])
+        )
+        msgspec_us, body = timed_us(lambda: encoder.encode(users))
+        compressed = []
+        for label, compress in compressors():
+            us, packed = timed_us(lambda: compress(body))
+            compressed.append(f"{label} {len(packed)}/{us:.0f}")
+        print(f"{n:>6} {pydantic_us:>13.0f} {msgspec_us:>12.0f} {len(body):>8}  {'  '.join(compressed)}")
+    if brotli is None:
+        print("(brotli is not installed: pip install brotli)")
+
+
+async def get(query_string: bytes, accept_encoding: bytes | None) -> tuple[int, int, bytes, float]:
+    headers = [(b"host", b"localhost")]
+    if accept_encoding:
+        headers.append((b"accept-encoding", accept_encoding))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/users",
+        "raw_path": b"/users",
+        "query_string": query_string,
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    status = 0
+    size = 0
+    encoding = b""
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status, size, encoding
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            encoding = dict(message["headers"]).get(b"content-encoding", b"")
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    started = time.perf_counter()
+    await asgi_app(scope, receive, send)
+    return status, size, encoding, (time.perf_counter() - started) * 1000
+
+
+async def over_the_app() -> None:
+    settings = asgi_app.state.settings
+    print(
+        f"\nthrough the app: RESPONSE_COMPRESSION={settings.response_compression},"
+        f" GZIP_COMPRESS_LEVEL={settings.gzip_compress_level}"
+    )
+    print(f"{'page':>6} {'encoding':>9} {'mean, ms':>9} {'bytes':>8}")
+    for n in PAGE_SIZES:
+        query_string = f"count={n}".encode()
+        for accept_encoding in (None, b"gzip"):
+            await get(query_string, accept_encoding)  # прогрев
+            results = [await get(query_string, accept_encoding) for _ in range(REPEATS)]
+            assert {status for status, _, _, _ in results} == {200}
+            _, size, encoding, _ = results[-1]
+            mean = statistics.mean(ms for _, _, _, ms in results)
+            print(f"{n:>6} {encoding.decode() or 'identity':>9} {mean:>9.2f} {size:>8}")
+
+
+async def main() -> None:
+    async with asgi_app.lifespan():
+        await encode_and_compress()
+        await over_the_app()
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    seed(rows)
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""Polling GET /users with and without If-None-Match.
+
+Repeats the same list request against an unchanged table, once as a plain
+poll and once revalidating with the ETag from the previous response, and
+reports latency and response bytes per request.
+
+Usage: python -m benchmarks.bench_conditional_get [page_size] [requests]
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+
+from app.main import app
+from app.models.user import Base
+
+USERS = 10_000
+
+
+def seed() -> None:
+    from sqlalchemy import create_engine
+    Base.metadata.create_all(create_engine(f"sqlite:///{DB_PATH}"))
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.executemany(
+            "INSERT INTO users (id, username, email, full_name) VALUES (?, ?, ?, ?)",
+            ((i, f"user{i}", f"user{i}@example.com", f"User {i}") for i in range(1, USERS + 1)),
+        )
+
+
+async def get(path: str, query: str, headers: list[tuple[bytes, bytes]]) -> tuple[int, dict, int]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"localhost"), *headers],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    response = {"status": 0, "headers": {}, "bytes": 0}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = dict(message["headers"])
+        elif message["type"] == "http.response.body":
+            response["bytes"] += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], response["bytes"]
+
+
+async def main(page_size: int, requests: int) -> None:
+    async with app.lifespan():
+        await poll(page_size, requests)
+
+
+async def poll(page_size: int, requests: int) -> None:
+    query = f"count={page_size}"
+    status, headers, _ = await get("/users", query, [])
+    etag = headers[b"etag"]
+
+    print(f"{'mode':>14} {'status':>7} {'ms/request':>11} {'bytes/request':>14}")
+    for label, request_headers in (("plain poll", []), ("If-None-Match", [(b"if-none-match", etag)])):
+        started = time.perf_counter()
+        total_bytes = 0
+        for _ in range(requests):
+            status, _, size = await get("/users", query, request_headers)
+            total_bytes += size
+        elapsed = (time.perf_counter() - started) / requests * 1000
+        print(f"{label:>14} {status:>7} {elapsed:>11.3f} {total_bytes // requests:>14}")
+
+
+if __name__ == "__main__":
+    page_size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    seed()
+    asyncio.run(main(page_size, requests))
@@ -0,0 +1,169 @@
+"""Per-request cost of dependency injection.
+
+Serves the same no-op handler from small Litestar apps that differ only in
+how `user_service` (and the session) are provided, and reports the time per
+request minus a handler without dependencies:
+
+- per-request chain: the previous layout, where three async providers
+  (session -> repository -> service) build a new repository and service and
+  open and close a session on every request;
+- sibling singletons: sync providers returning app-wide singletons and a lazy
+  session that is never used (closing it is skipped), all independent of each
+  other: Litestar resolves such a batch in an anyio task group;
+- chained singletons: the providers from app/providers.py, where the service
+  depends on the session, so every batch holds one dependency;
+- no database: a handler that only asks for the session factory (like the
+  export) gets no session at all.
+
+No statement is executed in any variant, so only DI is measured.
+
+Usage: python -m benchmarks.bench_di_overhead [requests]
+"""
+import asyncio
+import sys
+import time
+from typing import AsyncGenerator
+
+from litestar import Litestar, get
+from litestar.datastructures import State
+from litestar.di import Provide
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.cache import LRUCache
+from app.providers import make_user_repository, provide_db_session, provide_session_factory, provide_user_service
+from app.repositories.cached_user_repository import CachedUserRepository
+from app.repositories.user_repository import UserRepository
+from app.services.user_service import UserService
+
+engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+user_cache = LRUCache(maxsize=1024)
+
+
+# Прежняя схема: цепочка async-провайдеров, новые объекты на каждый запрос
+async def chain_db_session() -> AsyncGenerator[AsyncSession, None]:
+    async with session_factory() as session:
+        yield session
+
+
+async def chain_user_repository(db_session: AsyncSession) -> UserRepository:
+    repo = CachedUserRepository(user_cache)
+    repo.session = db_session
+    return repo
+
+
+async def chain_user_service(user_repository: UserRepository) -> UserService:
+    return UserService(user_repository)
+
+
+def sibling_user_service(state: State) -> UserService:
+    return state.user_service
+
+
+@get("/none", sync_to_thread=False)
+def no_dependencies() -> int:
+    return 1
+
+
+@get("/service", sync_to_thread=False)
+def service(user_service: UserService) -> int:
+    return 1
+
+
+@get("/service-session", sync_to_thread=False)
+def service_and_session(user_service: UserService, db_session: AsyncSession) -> int:
+    return 1
+
+
+@get("/factory", sync_to_thread=False)
+def factory_only(session_factory: async_sessionmaker) -> int:
+    return 1
+
+
+def singleton_app(user_service_provider=provide_user_service) -> Litestar:
+    state = State({
+        "session_factory": session_factory,
+        "user_service": UserService(make_user_repository(user_cache)),
+    })
+    return Litestar(
+        route_handlers=[no_dependencies, service_and_session, factory_only],
+        state=state,
+        dependencies={
+            "db_session": Provide(provide_db_session),
+            "session_factory": Provide(provide_session_factory, sync_to_thread=False),
+            "user_service": Provide(user_service_provider, sync_to_thread=False),
+        },
+    )
+
+
+def chain_app() -> Litestar:
+    return Litestar(
+        route_handlers=[no_dependencies, service],
+        dependencies={
+            "db_session": Provide(chain_db_session),
+            "user_repository": Provide(chain_user_repository),
+            "user_service": Provide(chain_user_service),
+        },
+    )
+
+
+async def get_path(app: Litestar, path: str) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    assert status == 200, (path, status)
+
+
+async def per_request_us(app: Litestar, path: str, requests: int) -> float:
+    for _ in range(200):  # прогрев: кэш маршрутов, модели сигнатур
+        await get_path(app, path)
+    best = float("inf")
+    # Лучший из трёх прогонов: меньше шума от GC и планировщика
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(requests):
+            await get_path(app, path)
+        best = min(best, (time.perf_counter() - started) / requests * 1e6)
+    return best
+
+
+async def main(requests: int) -> None:
+    variants = (
+        ("per-request chain", chain_app(), "/service"),
+        ("sibling singletons", singleton_app(sibling_user_service), "/service-session"),
+        ("chained singletons", singleton_app(), "/service-session"),
+        ("no database", singleton_app(), "/factory"),
+    )
+    baseline = await per_request_us(singleton_app(), "/none", requests)
+    print(f"no dependencies: {baseline:.1f} us/request")
+    print(f"{'variant':>22} {'us/request':>11} {'DI, us':>8}")
+    for label, app, path in variants:
+        elapsed = await per_request_us(app, path, requests)
+        print(f"{label:>22} {elapsed:>11.1f} {elapsed - baseline:>8.1f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,104 @@
+"""Stream GET /users/export over a large table and check peak RSS.
+
+The app is driven as a bare ASGI callable so the client side discards each
+chunk as it arrives; test clients buffer the whole body, which would hide
+whether the server streams. Exits non-zero if the RSS growth during the
+export exceeds the ceiling.
+
+Usage: python -m benchmarks.bench_export [rows] [format] [rss_ceiling_mb]
+"""
+import asyncio
+import os
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+# Страницы mmap файла БД попадают в RSS и растут вместе с таблицей — меряем только кучу
+os.environ.setdefault("SQLITE_MMAP_SIZE", "0")
+
+from app.main import app
+from app.models.user import Base
+
+
+def seed(rows: int) -> None:
+    from sqlalchemy import create_engine
+    Base.metadata.create_all(create_engine(f"sqlite:///{DB_PATH}"))
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.executemany(
+            "INSERT INTO users (id, username, email, full_name) VALUES (?, ?, ?, ?)",
+            ((i, f"user{i}", f"user{i}@example.com", f"User {i}") for i in range(1, rows + 1)),
+        )
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def export(export_format: str) -> tuple[int, int]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/users/export",
+        "raw_path": b"/users/export",
+        "query_string": f"format={export_format}".encode(),
+        "root_path": "",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    received = {"bytes": 0, "lines": 0, "status": 0}
+
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Как и ASGI-сервер, сообщаем об отключении только после конца ответа
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            received["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            received["bytes"] += len(body)
+            received["lines"] += body.count(b"\n")
+            if not message.get("more_body", False):
+                response_done.set()
+
+    await app(scope, receive, send)
+    assert received["status"] == 200, received
+    return received["bytes"], received["lines"]
+
+
+async def main(rows: int, export_format: str, ceiling_mb: float) -> int:
+    seed(rows)
+    baseline = peak_rss_mb()
+    async with app.lifespan():
+        started = time.perf_counter()
+        size, lines = await export(export_format)
+        elapsed = time.perf_counter() - started
+    growth = peak_rss_mb() - baseline
+
+    print(f"rows: {rows}, format: {export_format}, lines: {lines}, bytes: {size}")
+    print(f"time: {elapsed:.1f}s ({rows / elapsed:.0f} rows/s)")
+    print(f"peak RSS growth: {growth:.1f} MB (ceiling {ceiling_mb:.0f} MB)")
+    return 0 if growth <= ceiling_mb else 1
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    export_format = sys.argv[2] if len(sys.argv) > 2 else "ndjson"
+    ceiling_mb = float(sys.argv[3]) if len(sys.argv) > 3 else 64
+    sys.exit(asyncio.run(main(rows, export_format, ceiling_mb)))
@@ -0,0 +1,61 @@
+"""OFFSET vs keyset pagination latency across page depth.
+
+Usage: python -m benchmarks.bench_pagination [rows] [page_size]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.models.user import Base, User
+from app.repositories.user_repository import UserRepository
+
+REPEATS = 20
+
+
+async def seed(engine, rows: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        batch = 10_000
+        for start in range(1, rows + 1, batch):
+            await conn.execute(insert(User), [
+                {"username": f"user{i}", "email": f"user{i}@example.com", "full_name": f"User {i}"}
+                for i in range(start, min(start + batch, rows + 1))
+            ])
+
+
+async def timed(coro_factory) -> float:
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        await coro_factory()
+    return (time.perf_counter() - started) / REPEATS * 1000
+
+
+async def main(rows: int, page_size: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    await seed(engine, rows)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    print(f"{'page':>10} {'offset, ms':>12} {'keyset, ms':>12}")
+    async with session_factory() as session:
+        repo = UserRepository()
+        last_page = rows // page_size
+        for page in (1, last_page // 100 or 1, last_page // 10 or 1, last_page // 2 or 1, last_page):
+            after_id = (page - 1) * page_size
+            offset_ms = await timed(lambda: repo.get_read_by_filter(session, count=page_size, page=page))
+            keyset_ms = await timed(lambda: repo.get_after_id(session, after_id, page_size))
+            print(f"{page:>10} {offset_ms:>12.2f} {keyset_ms:>12.2f}")
+            session.expunge_all()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    page_size = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    asyncio.run(main(rows, page_size))
@@ -0,0 +1,67 @@
+"""ORM + Pydantic read path vs row tuples + msgspec structs.
+
+For each page size, times fetching a page and encoding it to JSON:
+- orm: select(User) -> UserResponse.model_validate -> model_dump -> JSON
+  (what the Pydantic plugin does for a handler returning UserResponse)
+- rows: select(columns) -> UserRead(*row) -> msgspec JSON
+
+Usage: python -m benchmarks.bench_read_path [repeats]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import msgspec
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.models.user import Base, User
+from app.repositories.user_repository import UserRepository
+from app.schemas.user_schema import UserResponse
+
+PAGE_SIZES = (10, 100, 1000)
+
+
+async def seed(engine, rows: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [
+            {"username": f"user{i}", "email": f"user{i}@example.com", "full_name": f"User {i}"}
+            for i in range(1, rows + 1)
+        ])
+
+
+async def main(repeats: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    await seed(engine, max(PAGE_SIZES))
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    encoder = msgspec.json.Encoder()
+
+    async def orm_path(count: int) -> bytes:
+        async with session_factory() as session:
+            users = await UserRepository().get_by_filter(session, count=count, page=1)
+            return encoder.encode([UserResponse.model_validate(user).model_dump(mode="json") for user in users])
+
+    async def rows_path(count: int) -> bytes:
+        async with session_factory() as session:
+            return encoder.encode(await UserRepository().get_read_by_filter(session, count=count, page=1))
+
+    print(f"{'rows':>6} {'orm, ms':>10} {'rows, ms':>10} {'speedup':>8}")
+    for count in PAGE_SIZES:
+        assert msgspec.json.decode(await orm_path(count)) == msgspec.json.decode(await rows_path(count))
+        timings = []
+        for path_fn in (orm_path, rows_path):
+            started = time.perf_counter()
+            for _ in range(repeats):
+                await path_fn(count)
+            timings.append((time.perf_counter() - started) / repeats * 1000)
+        print(f"{count:>6} {timings[0]:>10.3f} {timings[1]:>10.3f} {timings[0] / timings[1]:>7.1f}x")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,98 @@
+"""GET /users with and without `fields=`: latency and payload per page.
+
+Requests the same pages (OFFSET and cursor mode) with every field and with
+`fields=id,username` straight into the ASGI app and reports latency and the
+response size.
+
+Usage: python -m benchmarks.bench_sparse_fields [rows] [page_size] [requests]
+"""
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ["USER_CACHE_SIZE"] = "0"
+
+from app.main import app as asgi_app
+from app.models.user import Base
+
+# (label, extra query string)
+VARIANTS = (
+    ("all fields", ""),
+    ("id,username", "&fields=id,username"),
+)
+
+
+def seed(rows: int) -> None:
+    from sqlalchemy import create_engine
+    Base.metadata.create_all(create_engine(f"sqlite:///{DB_PATH}"))
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.executemany(
+            "INSERT INTO users (id, username, email, full_name) VALUES (?, ?, ?, ?)",
+            (
+                (i, f"user{i}", f"user{i}@example.com", f"User Number {i} With A Longer Full Name")
+                for i in range(1, rows + 1)
+            ),
+        )
+
+
+async def get(query_string: bytes) -> tuple[int, int, float]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/users",
+        "raw_path": b"/users",
+        "query_string": query_string,
+        "root_path": "",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    status = 0
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    started = time.perf_counter()
+    await asgi_app(scope, receive, send)
+    return status, size, (time.perf_counter() - started) * 1000
+
+
+async def run(rows: int, page_size: int, requests: int) -> None:
+    async with asgi_app.lifespan():
+        print(f"{'mode':>8} {'variant':>12} {'mean, ms':>9} {'p50, ms':>8} {'bytes':>8}")
+        for mode, base in (("offset", f"count={page_size}&page=10"), ("cursor", f"count={page_size}&cursor=")):
+            for label, extra in VARIANTS:
+                query_string = (base + extra).encode()
+                await get(query_string)  # прогрев: маршрут, соединение, класс проекции
+                results = [await get(query_string) for _ in range(requests)]
+                assert {status for status, _, _ in results} == {200}
+                latencies = [ms for _, _, ms in results]
+                print(
+                    f"{mode:>8} {label:>12} {statistics.mean(latencies):>9.2f}"
+                    f" {statistics.median(latencies):>8.2f} {results[-1][1]:>8}"
+                )
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    page_size = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    requests = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    seed(rows)
+    asyncio.run(run(rows, page_size, requests))
@@ -0,0 +1,110 @@
+"""GET /users?include_total=true on a large table: COUNT(*) per request vs the cached total.
+
+Runs the same first-page request without a total, with an exact count on
+every request (threshold above the table size) and with the cached total
+(threshold below it), straight into the ASGI app, and reports latency and
+the SQL statements per request. The cached variant starts from the
+planner's estimate (ANALYZE has run), so only its background recount scans
+the table.
+
+Usage: python -m benchmarks.bench_total_count [rows] [requests]
+"""
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+
+from app.main import app as asgi_app
+from app.models.user import Base
+from app.query_guard import QueryCounter
+
+# (label, query string, exact_threshold or None for the app's default)
+VARIANTS = (
+    ("no total", b"count=50", None),
+    ("exact COUNT(*)", b"count=50&include_total=true", sys.maxsize),
+    ("cached total", b"count=50&include_total=true", 10_000),
+)
+
+
+def seed(rows: int) -> None:
+    from sqlalchemy import create_engine
+    Base.metadata.create_all(create_engine(f"sqlite:///{DB_PATH}"))
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.executemany(
+            "INSERT INTO users (id, username, email, full_name) VALUES (?, ?, ?, ?)",
+            ((i, f"user{i}", f"user{i}@example.com", f"User {i}") for i in range(1, rows + 1)),
+        )
+        conn.execute("ANALYZE")
+
+
+async def get(query_string: bytes) -> tuple[int, dict[bytes, bytes], float]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/users",
+        "raw_path": b"/users",
+        "query_string": query_string,
+        "root_path": "",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    status = 0
+    headers = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status, headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            headers = dict(message["headers"])
+
+    started = time.perf_counter()
+    await asgi_app(scope, receive, send)
+    return status, headers, (time.perf_counter() - started) * 1000
+
+
+async def run(rows: int, requests: int) -> None:
+    async with asgi_app.lifespan():
+        state = asgi_app.state
+        user_total = state.user_total
+        print(f"{'variant':>16} {'mean, ms':>9} {'p50, ms':>8} {'p99, ms':>8} {'stmts/req':>10} {'total':>9} {'exact':>6}")
+        for label, query_string, threshold in VARIANTS:
+            if threshold is not None:
+                user_total.exact_threshold = threshold
+            await get(query_string)  # прогрев; для кэша — оценка и фоновый пересчёт
+            await asyncio.sleep(0)
+            while user_total._counting is not None:
+                await asyncio.sleep(0.01)
+            with QueryCounter(state.engine) as counter:
+                results = [await get(query_string) for _ in range(requests)]
+            assert {status for status, _, _ in results} == {200}
+            headers = results[-1][1]
+            total = headers.get(b"x-total-count", b"-").decode()
+            exact = headers.get(b"x-total-count-exact", b"-").decode()
+            if total != "-":
+                assert int(total) == rows, total
+            latencies = sorted(ms for _, _, ms in results)
+            p99 = latencies[int(len(latencies) * 0.99) - 1]
+            print(
+                f"{label:>16} {statistics.mean(latencies):>9.2f} {statistics.median(latencies):>8.2f}"
+                f" {p99:>8.2f} {counter.count / requests:>10.1f} {total:>9} {exact:>6}"
+            )
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    seed(rows)
+    asyncio.run(run(rows, requests))
@@ -0,0 +1,80 @@
+"""get_read_by_id latency with the read-through user cache on and off.
+
+Simulates GET /users/{id} traffic where 95% of reads go to a small hot set;
+every request opens its own session, like provide_db_session does.
+
+Usage: python -m benchmarks.bench_user_cache [rows] [requests]
+"""
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.cache import LRUCache
+from app.models.user import Base, User
+from app.repositories.cached_user_repository import CachedUserRepository
+from app.repositories.user_repository import UserRepository
+
+HOT_SET = 500
+HOT_RATIO = 0.95
+
+
+async def seed(engine, rows: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [
+            {"username": f"user{i}", "email": f"user{i}@example.com", "full_name": f"User {i}"}
+            for i in range(1, rows + 1)
+        ])
+
+
+def percentile(samples: list[float], q: float) -> float:
+    return statistics.quantiles(samples, n=100)[q - 1] if len(samples) > 1 else samples[0]
+
+
+async def run(session_factory, repo: UserRepository, ids: list[int]) -> list[float]:
+    samples = []
+    for user_id in ids:
+        started = time.perf_counter()
+        async with session_factory() as session:
+            await repo.get_read_by_id(session, user_id)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def main(rows: int, requests: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    await seed(engine, rows)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    rnd = random.Random(42)
+    ids = [
+        rnd.randint(1, HOT_SET) if rnd.random() < HOT_RATIO else rnd.randint(1, rows)
+        for _ in range(requests)
+    ]
+
+    cache = LRUCache(maxsize=2 * HOT_SET, ttl=60)
+    results = {
+        "cache off": await run(session_factory, UserRepository(), ids),
+        "cache on": await run(session_factory, CachedUserRepository(cache), ids),
+    }
+
+    print(f"{'mode':>10} {'p50, ms':>10} {'p99, ms':>10}")
+    for mode, samples in results.items():
+        print(f"{mode:>10} {percentile(samples, 50):>10.3f} {percentile(samples, 99):>10.3f}")
+    print("cache stats:", cache.stats())
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    asyncio.run(main(rows, requests))
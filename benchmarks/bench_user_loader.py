@@ -0,0 +1,111 @@
+"""Burst of concurrent GET /users/{id} with and without the batching loader.
+
+Fires `requests` concurrent requests over `distinct` overlapping ids straight
+into the ASGI app (test clients serialize requests, which would hide any
+coalescing) and reports wall time, latency and the number of SQL statements.
+The user cache is disabled so every request reaches the loader.
+
+Usage: python -m benchmarks.bench_user_loader [requests] [distinct]
+"""
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ["USER_CACHE_SIZE"] = "0"
+
+from functools import partial
+
+from app.loader import DataLoader
+from app.main import app as asgi_app
+from app.models.user import Base
+from app.providers import load_users
+from app.query_guard import QueryCounter
+
+USERS = 10_000
+
+# (label, loader factory taking the batch function)
+VARIANTS = (
+    ("no loader", lambda batch_fn: None),
+    ("loader, same tick", lambda batch_fn: DataLoader(batch_fn)),
+    ("loader, 1 ms window", lambda batch_fn: DataLoader(batch_fn, delay=0.001)),
+)
+
+
+def seed() -> None:
+    from sqlalchemy import create_engine
+    Base.metadata.create_all(create_engine(f"sqlite:///{DB_PATH}"))
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.executemany(
+            "INSERT INTO users (id, username, email, full_name) VALUES (?, ?, ?, ?)",
+            ((i, f"user{i}", f"user{i}@example.com", f"User {i}") for i in range(1, USERS + 1)),
+        )
+
+
+async def get(path: str) -> tuple[int, float]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    started = time.perf_counter()
+    await asgi_app(scope, receive, send)
+    return status, (time.perf_counter() - started) * 1000
+
+
+async def burst(requests: int, distinct: int) -> None:
+    async with asgi_app.lifespan():
+        await run_variants(requests, distinct)
+
+
+async def run_variants(requests: int, distinct: int) -> None:
+    state = asgi_app.state
+    user_service = state.user_service
+    batch_fn = partial(load_users, state.session_factory, user_service.user_repository)
+    await get("/users/1")  # прогрев: маршруты, соединения пула
+    print(f"{'variant':>20} {'wall, ms':>9} {'p50, ms':>8} {'p99, ms':>8} {'statements':>11} {'batches':>8}")
+    for label, make_loader in VARIANTS:
+        user_service.user_loader = loader = make_loader(batch_fn)
+        with QueryCounter(state.engine) as counter:
+            started = time.perf_counter()
+            results = await asyncio.gather(*(get(f"/users/{i % distinct + 1}") for i in range(requests)))
+            wall = (time.perf_counter() - started) * 1000
+        assert all(status == 200 for status, _ in results), {status for status, _ in results}
+        latencies = sorted(ms for _, ms in results)
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        batches = loader.stats()["batches"] if loader is not None else "-"
+        print(
+            f"{label:>20} {wall:>9.1f} {statistics.median(latencies):>8.2f} {p99:>8.2f}"
+            f" {counter.count:>11} {batches:>8}"
+        )
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    seed()
+    asyncio.run(burst(requests, distinct))
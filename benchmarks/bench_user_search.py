@@ -0,0 +1,89 @@
+"""User search: LIKE '%q%' table scan vs the FTS5 trigram index.
+
+Seeds `rows` users (triggers fill users_fts as they would in production),
+then times the same queries through LIKE over the three columns and through
+UserRepository.search. Rare terms are where LIKE has to read every row.
+
+Usage: python -m benchmarks.bench_user_search [rows]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import insert, select, or_
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.models.user import Base, User
+from app.repositories.user_repository import UserRepository
+
+REPEATS = 5
+LIMIT = 20
+FIRST_NAMES = ("Anna", "Boris", "Chen", "Dmitri", "Elena", "Farid", "Greta", "Hiro", "Ivan", "Julia")
+LAST_NAMES = ("Ivanova", "Smith", "Okafor", "Nakamura", "Kowalski", "Garcia", "Novak", "Larsen", "Haddad", "Moreau")
+
+# (query, how common it is)
+QUERIES = (
+    ("smith", "10% of rows"),
+    ("user4242", "111 rows"),
+    ("user987654", "1 row"),
+    ("nosuchuser", "no rows"),
+)
+
+
+async def seed(engine, rows: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        batch = 10_000
+        for start in range(1, rows + 1, batch):
+            await conn.execute(insert(User), [
+                {
+                    "username": f"user{i}",
+                    "email": f"user{i}@example.com",
+                    "full_name": f"{FIRST_NAMES[i % 10]} {LAST_NAMES[i // 10 % 10]}",
+                }
+                for i in range(start, min(start + batch, rows + 1))
+            ])
+
+
+async def like_search(session: AsyncSession, q: str) -> list:
+    pattern = f"%{q}%"
+    query = (
+        select(User.id)
+        .where(or_(User.username.like(pattern), User.full_name.like(pattern), User.email.like(pattern)))
+        .order_by(User.id)
+        .limit(LIMIT)
+    )
+    return list((await session.execute(query)).scalars())
+
+
+async def timed(coro_factory) -> tuple[float, int]:
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        found = await coro_factory()
+    return (time.perf_counter() - started) / REPEATS * 1000, len(found)
+
+
+async def main(rows: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    started = time.perf_counter()
+    await seed(engine, rows)
+    print(f"seeded {rows} users with FTS triggers in {time.perf_counter() - started:.1f}s")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    print(f"{'query':>12} {'matches':>12} {'LIKE, ms':>10} {'FTS5, ms':>10} {'rows':>6}")
+    async with session_factory() as session:
+        repo = UserRepository()
+        for q, frequency in QUERIES:
+            like_ms, like_found = await timed(lambda: like_search(session, q))
+            fts_ms, fts_found = await timed(lambda: repo.search(session, q, LIMIT))
+            print(f"{q:>12} {frequency:>12} {like_ms:>10.2f} {fts_ms:>10.2f} {fts_found:>3}/{like_found:<3}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    asyncio.run(main(rows))
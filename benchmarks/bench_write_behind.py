@@ -0,0 +1,141 @@
+"""Burst of concurrent PUT /users/{id} {"full_name": ...}: synchronous vs write-behind.
+
+Fires `requests` concurrent updates over `distinct` users straight into the
+ASGI app and reports how long the burst takes to be acknowledged, latency,
+and the SQL statements and transactions needed to persist it. The
+write-behind variants are closed afterwards, as on shutdown, so "drain, ms"
+is the time left to write what was still pending. Each variant checks that
+every user ends up with one of the values sent to it in that variant.
+
+Usage: python -m benchmarks.bench_write_behind [requests] [distinct]
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+
+from functools import partial
+
+from app.main import app as asgi_app
+from app.models.user import Base
+from app.providers import flush_user_updates
+from app.query_guard import QueryCounter
+from app.write_behind import WriteBehindQueue
+
+USERS = 10_000
+
+# (label, queue factory taking the flush function)
+VARIANTS = (
+    ("synchronous", lambda flush_fn: None),
+    ("write-behind, 10 ms", lambda flush_fn: WriteBehindQueue(flush_fn, interval=0.01)),
+    ("write-behind, 50 ms", lambda flush_fn: WriteBehindQueue(flush_fn, interval=0.05)),
+)
+
+
+def seed() -> None:
+    from sqlalchemy import create_engine
+    Base.metadata.create_all(create_engine(f"sqlite:///{DB_PATH}"))
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.executemany(
+            "INSERT INTO users (id, username, email, full_name) VALUES (?, ?, ?, ?)",
+            ((i, f"user{i}", f"user{i}@example.com", f"User {i}") for i in range(1, USERS + 1)),
+        )
+
+
+async def put(path: str, data: dict) -> tuple[int, float]:
+    body = json.dumps(data).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "PUT",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    started = time.perf_counter()
+    await asgi_app(scope, receive, send)
+    return status, (time.perf_counter() - started) * 1000
+
+
+async def burst(requests: int, distinct: int) -> None:
+    async with asgi_app.lifespan():
+        await run_variants(requests, distinct)
+
+
+async def run_variants(requests: int, distinct: int) -> None:
+    state = asgi_app.state
+    user_service = state.user_service
+    flush_fn = partial(flush_user_updates, state.session_factory, user_service.user_repository)
+    await put("/users/1", {"full_name": "warm-up"})  # прогрев: маршруты, соединения пула
+    print(
+        f"{'variant':>20} {'ack, ms':>8} {'p50, ms':>8} {'p99, ms':>8}"
+        f" {'drain, ms':>10} {'statements':>11} {'batches':>8} {'rows':>6}"
+    )
+    for label, make_queue in VARIANTS:
+        user_service.write_behind = queue = make_queue(flush_fn)
+        if queue is not None:
+            queue.start()
+        with QueryCounter(state.engine) as counter:
+            started = time.perf_counter()
+            results = await asyncio.gather(*(
+                put(f"/users/{i % distinct + 1}", {"full_name": f"{label} {i}"}) for i in range(requests)
+            ))
+            ack = (time.perf_counter() - started) * 1000
+            drain_started = time.perf_counter()
+            if queue is not None:
+                await queue.close()
+            drain = (time.perf_counter() - drain_started) * 1000
+        statuses = {status for status, _ in results}
+        assert statuses <= {200, 202}, statuses
+
+        with sqlite3.connect(DB_PATH) as conn:
+            stored = dict(conn.execute("SELECT id, full_name FROM users WHERE id <= ?", (distinct,)))
+        # Порядок конкурентных запросов к одному пользователю не задан, поэтому проверяем только,
+        # что у каждого пользователя в БД одно из значений этого прогона
+        assert all(
+            value.startswith(f"{label} ") and int(value.rsplit(" ", 1)[1]) % distinct + 1 == user_id
+            for user_id, value in stored.items()
+        ), "lost updates"
+
+        latencies = sorted(ms for _, ms in results)
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        stats = queue.stats() if queue is not None else {"batches": "-", "written": requests}
+        print(
+            f"{label:>20} {ack:>8.1f} {statistics.median(latencies):>8.2f} {p99:>8.2f}"
+            f" {drain:>10.1f} {counter.count:>11} {stats['batches']:>8} {stats['written']:>6}"
+        )
+    user_service.write_behind = None
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    seed()
+    asyncio.run(burst(requests, distinct))
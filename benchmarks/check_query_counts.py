@@ -0,0 +1,105 @@
+"""N+1 guard: every endpoint must issue a fixed number of queries.
+
+Calls each read endpoint (and every orders loading strategy) through the app
+at two dataset sizes and fails if any of them exceeds its query budget or if
+the number of queries grows with the data.
+
+Usage: python -m benchmarks.check_query_counts
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "check.sqlite3")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ["USER_CACHE_SIZE"] = "0"
+
+from litestar.testing import AsyncTestClient
+
+from app.main import app
+from app.models.user import Base
+from app.query_guard import QueryCounter
+
+PRODUCTS_PER_ORDER = 5
+
+# (url, query budget)
+ENDPOINTS = [
+    ("/users/1", 1),
+    ("/users/1/stats", 1),
+    ("/users?count=100", 1),
+    ("/users?cursor=&count=100", 1),
+    ("/users?count=100&fields=username", 1),
+    ("/users?cursor=&count=100&fields=username", 1),
+    ("/users/search?q=user", 1),
+    ("/products?count=100", 1),
+    ("/orders/1?strategy=joined", 1),
+    ("/orders/1?strategy=selectin", 3),
+    ("/orders/1?strategy=projection", 1),
+    ("/orders?count=100&strategy=selectin", 3),
+    ("/orders?count=100&strategy=joined", 1),
+    ("/orders?count=100&strategy=projection", 1),
+    ("/orders?count=100&user_id=1&strategy=selectin", 3),
+    ("/orders/top?n=100", 1),
+]
+
+
+def seed(users: int) -> None:
+    """Grow the dataset to `users` users, each with one address and one order"""
+    with sqlite3.connect(DB_PATH) as conn:
+        start = conn.execute("SELECT COALESCE(MAX(id), 0) FROM users").fetchone()[0] + 1
+        if conn.execute("SELECT COUNT(*) FROM products").fetchone()[0] == 0:
+            conn.executemany(
+                "INSERT INTO products (id, title, price_cents) VALUES (?, ?, ?)",
+                [(i, f"Product {i}", i * 100) for i in range(1, 51)],
+            )
+        ids = range(start, users + 1)
+        conn.executemany(
+            "INSERT INTO users (id, username, email) VALUES (?, ?, ?)",
+            [(i, f"user{i}", f"user{i}@example.com") for i in ids],
+        )
+        conn.executemany(
+            "INSERT INTO addresses (id, user_id, city, street) VALUES (?, ?, ?, ?)",
+            [(i, i, "City", f"Street {i}") for i in ids],
+        )
+        conn.executemany(
+            "INSERT INTO orders (id, user_id, shipping_address_id) VALUES (?, ?, ?)",
+            [(i, i, i) for i in ids],
+        )
+        conn.executemany(
+            "INSERT INTO order_products (order_id, product_id) VALUES (?, ?)",
+            [(i, (i + k) % 50 + 1) for i in ids for k in range(PRODUCTS_PER_ORDER)],
+        )
+
+
+async def measure(client: AsyncTestClient) -> dict[str, int]:
+    counts = {}
+    for url, _ in ENDPOINTS:
+        with QueryCounter(app.state.engine) as counter:
+            response = await client.get(url)
+        assert response.status_code == 200, (url, response.status_code, response.text)
+        counts[url] = counter.count
+    return counts
+
+
+async def main() -> int:
+    results = []
+    async with AsyncTestClient(app) as client:
+        async with app.state.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        for size in (3, 300):
+            seed(size)
+            results.append(await measure(client))
+
+    failed = False
+    for url, budget in ENDPOINTS:
+        small, large = (r[url] for r in results)
+        ok = large <= budget and small == large
+        failed = failed or not ok
+        print(f"{'OK ' if ok else 'FAIL'} {url}: {small} -> {large} queries (budget {budget})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,106 @@
+"""Index advisor: no endpoint may fall back to a full table scan.
+
+Calls every endpoint (reads and writes) through the app, runs EXPLAIN QUERY
+PLAN on each statement the repositories emit and fails if a table is scanned
+without an index. Listing pages and exports walk the table on purpose; their
+tables are listed as allowed scans.
+
+Usage: python -m benchmarks.check_query_plans
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "plans.sqlite3")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ["USER_CACHE_SIZE"] = "0"
+
+from litestar.testing import AsyncTestClient
+
+from app.main import app
+from app.models.user import Base
+from app.query_guard import QueryPlanAdvisor
+
+USERS = 1000
+PRODUCTS = 1000
+
+# (method, url, json body, tables allowed to be scanned)
+ENDPOINTS = [
+    ("GET", "/users/1", None, ()),
+    ("GET", "/users/1/stats", None, ()),
+    ("GET", "/users?count=100&page=3", None, ("users",)),
+    ("GET", "/users?cursor=&count=100", None, ()),
+    ("GET", "/users/search?q=user12", None, ()),
+    ("GET", "/users/export?format=ndjson", None, ("users",)),
+    ("GET", "/products?count=100", None, ("products",)),
+    ("GET", "/orders/1?strategy=joined", None, ()),
+    ("GET", "/orders/1?strategy=selectin", None, ()),
+    ("GET", "/orders/1?strategy=projection", None, ()),
+    ("GET", "/orders?count=100&strategy=selectin", None, ("orders",)),
+    ("GET", "/orders?count=100&strategy=joined", None, ("orders",)),
+    ("GET", "/orders?count=100&strategy=projection", None, ("orders",)),
+    ("GET", "/orders?count=100&user_id=1&strategy=selectin", None, ()),
+    ("GET", "/orders?count=100&user_id=1&strategy=projection", None, ()),
+    ("GET", "/orders/top?n=10", None, ()),
+    ("POST", "/users", {"username": "plan", "email": "plan@example.com"}, ()),
+    ("PUT", "/users/2", {"full_name": "Plan Check"}, ()),
+    ("DELETE", f"/users/{USERS}", None, ()),
+    ("POST", "/users/bulk", [{"username": "bulk1", "email": "bulk1@example.com"}], ()),
+    ("PATCH", "/users/bulk", [{"id": 3, "full_name": "Bulk"}], ()),
+    ("DELETE", "/users/bulk", [USERS - 1], ()),
+    ("POST", "/orders", {"user_id": 5, "shipping_address_id": 5, "product_ids": [1, 2]}, ()),
+    ("POST", "/orders/5/products", {"product_ids": [3]}, ()),
+]
+
+
+def seed(users: int) -> None:
+    """Users with one address and one two-product order each"""
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.executemany(
+            "INSERT INTO products (id, title, price_cents) VALUES (?, ?, ?)",
+            [(i, f"Product {i}", i * 100) for i in range(1, PRODUCTS + 1)],
+        )
+        ids = range(1, users + 1)
+        conn.executemany(
+            "INSERT INTO users (id, username, email) VALUES (?, ?, ?)",
+            [(i, f"user{i}", f"user{i}@example.com") for i in ids],
+        )
+        conn.executemany(
+            "INSERT INTO addresses (id, user_id, city, street) VALUES (?, ?, ?, ?)",
+            [(i, i, "City", f"Street {i}") for i in ids],
+        )
+        conn.executemany(
+            "INSERT INTO orders (id, user_id, shipping_address_id) VALUES (?, ?, ?)",
+            [(i, i, i) for i in ids if i < users - 1],
+        )
+        conn.executemany(
+            "INSERT INTO order_products (order_id, product_id) VALUES (?, ?)",
+            [(i, (i + k) % PRODUCTS + 1) for i in ids if i < users - 1 for k in range(2)],
+        )
+        conn.execute("ANALYZE")
+
+
+async def main() -> int:
+    failed = False
+    async with AsyncTestClient(app) as client:
+        async with app.state.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        seed(USERS)
+
+        for method, url, body, allowed in ENDPOINTS:
+            with QueryPlanAdvisor(app.state.engine) as advisor:
+                response = await client.request(method, url, json=body)
+            assert response.status_code < 300, (method, url, response.status_code, response.text)
+            unexpected = sorted(table for table in advisor.scans if table not in allowed)
+            failed = failed or bool(unexpected)
+            print(f"{'FAIL' if unexpected else 'OK  '} {method} {url}: full scans {unexpected or 'none'}")
+            for table in unexpected:
+                for statement in advisor.scans[table]:
+                    print(f"       {' '.join(statement.split())}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,248 @@
+"""Read-replica routing against local SQLite files.
+
+A primary file is seeded and copied to two replica files; nothing
+replicates afterwards, so a replica never sees new writes, which is the
+worst case of replication lag. The script counts statements per engine and
+checks that:
+  - reads are spread over the replicas round-robin and never hit the primary;
+  - writes, and the reads a write depends on, go to the primary;
+  - after a write, the client's cookie pins its reads to the primary, while
+    a client without it still reads the (stale) replica;
+  - with the user cache and loader on, a replica read never lands in the
+    shared cache, so the writer still reads its own write;
+  - least_latency prefers the faster replica.
+
+Works the same with local PostgreSQL instances: set PRIMARY_URL and
+REPLICA_URLS (comma-separated) to databases that already hold the schema
+and the seed users.
+
+Usage: python -m benchmarks.check_replica_routing
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from dataclasses import replace
+
+import msgspec
+from litestar.testing import AsyncTestClient
+from sqlalchemy import create_engine, event
+
+from app.main import create_app
+from app.models.user import Base
+from app.query_guard import QueryCounter
+from app.replicas import STICKY_COOKIE
+from app.settings import Settings
+
+USERS = 100
+
+
+def sqlite_setup() -> tuple[str, list[str]]:
+    directory = tempfile.mkdtemp()
+    primary = os.path.join(directory, "primary.sqlite3")
+    Base.metadata.create_all(create_engine(f"sqlite:///{primary}"))
+    with sqlite3.connect(primary) as conn:
+        conn.executemany(
+            "INSERT INTO users (id, username, email, full_name) VALUES (?, ?, ?, ?)",
+            ((i, f"user{i}", f"user{i}@example.com", f"User {i}") for i in range(1, USERS + 1)),
+        )
+    replicas = []
+    for name in ("replica1", "replica2"):
+        path = os.path.join(directory, f"{name}.sqlite3")
+        with sqlite3.connect(primary) as source, sqlite3.connect(path) as target:
+            source.backup(target)
+        replicas.append(path)
+    return f"sqlite+aiosqlite:///{primary}", [f"sqlite+aiosqlite:///{path}" for path in replicas]
+
+
+class EngineCounters:
+    """Statements per engine (primary first) over a block of requests"""
+
+    def __init__(self, state):
+        self.engines = [state.engine.sync_engine, *state.replicas.engines]
+
+    def __enter__(self):
+        self.counters = [QueryCounter(engine).__enter__() for engine in self.engines]
+        return self
+
+    def __exit__(self, *exc):
+        for counter in self.counters:
+            counter.__exit__(*exc)
+
+    @property
+    def counts(self) -> list[int]:
+        return [counter.count for counter in self.counters]
+
+
+def report(results: list[tuple[str, bool, str]]) -> int:
+    failed = False
+    for name, ok, detail in results:
+        failed = failed or not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {name}: {detail}")
+    return 1 if failed else 0
+
+
+async def check_round_robin(settings: Settings) -> list[tuple[str, bool, str]]:
+    results = []
+    app = create_app(settings)
+    async with AsyncTestClient(app) as client:
+        with EngineCounters(app.state) as counters:
+            for user_id in range(1, 9):
+                response = await client.get(f"/users/{user_id}")
+                assert response.status_code == 200, response.text
+        primary, *replicas = counters.counts
+        results.append((
+            "reads round-robin over replicas",
+            primary == 0 and replicas == [4, 4],
+            f"primary={primary} replicas={replicas}",
+        ))
+
+        with EngineCounters(app.state) as counters:
+            response = await client.post(
+                "/users", json={"username": "fresh", "email": "fresh@example.com", "full_name": "Fresh"}
+            )
+        assert response.status_code == 201, response.text
+        new_id = response.json()["id"]
+        primary, *replicas = counters.counts
+        results.append(("write goes to primary", primary == 1 and sum(replicas) == 0, f"primary={primary} replicas={replicas}"))
+        results.append(("write sets the sticky cookie", "db_primary_until" in client.cookies, str(dict(client.cookies))))
+
+        with EngineCounters(app.state) as counters:
+            sticky = await client.get(f"/users/{new_id}")
+        primary, *replicas = counters.counts
+        results.append((
+            "read after write (cookie) sees the write",
+            sticky.status_code == 200 and primary == 1 and sum(replicas) == 0,
+            f"status={sticky.status_code} primary={primary} replicas={replicas}",
+        ))
+
+        client.cookies.clear()
+        # Без cookie: проверка If-Match/существования перед записью всё равно читает primary
+        with EngineCounters(app.state) as counters:
+            response = await client.put(f"/users/{new_id}", json={})
+        primary, *replicas = counters.counts
+        results.append((
+            "empty update reads the primary",
+            response.status_code == 200 and primary == 1 and sum(replicas) == 0,
+            f"status={response.status_code} primary={primary} replicas={replicas}",
+        ))
+
+        stale = await client.get(f"/users/{new_id}")
+        results.append((
+            "read without cookie goes to a (lagging) replica",
+            stale.status_code == 404,
+            f"status={stale.status_code}",
+        ))
+    return results
+
+
+async def check_cached_reads(settings: Settings) -> list[tuple[str, bool, str]]:
+    results = []
+    app = create_app(replace(settings, user_cache_size=1024, user_loader_max_batch=500))
+    async with AsyncTestClient(app) as client:
+        response = await client.put("/users/5", json={"full_name": "Changed"})
+        assert response.status_code == 200, response.text
+        writer_cookies = dict(client.cookies)
+
+        # Другой клиент без cookie читает отстающую реплику
+        client.cookies.clear()
+        other = await client.get("/users/5")
+        cached = await app.state.user_cache.get("user:5")
+        results.append((
+            "replica read is not cached",
+            other.json()["full_name"] == "User 5" and cached is None,
+            f"other client got {other.json()['full_name']!r}, cache holds {cached!r}",
+        ))
+
+        client.cookies.update(writer_cookies)
+        own = await client.get("/users/5")
+        results.append((
+            "writer reads its write with the cache on",
+            own.json()["full_name"] == "Changed",
+            f"full_name={own.json()['full_name']!r}",
+        ))
+
+        # Чтение с primary закэшировано; подменяем запись на более старую, как в кэше другого воркера
+        fresh = await app.state.user_cache.get("user:5")
+        await app.state.user_cache.set("user:5", msgspec.structs.replace(fresh, full_name="Older"))
+        pinned = await client.get("/users/5")
+        results.append((
+            "pinned read bypasses the cache",
+            pinned.json()["full_name"] == "Changed",
+            f"full_name={pinned.json()['full_name']!r}",
+        ))
+    return results
+
+
+async def check_deferred_writes(settings: Settings) -> list[tuple[str, bool, str]]:
+    app = create_app(replace(settings, user_write_behind_max_batch=100, user_write_behind_interval_ms=10))
+    async with AsyncTestClient(app) as client:
+        client.cookies.clear()
+        response = await client.put("/users/6", json={"full_name": "Deferred"})
+        assert response.status_code == 202, response.text
+        results = [
+            (
+                "deferred write sets the sticky cookie",
+                STICKY_COOKIE in client.cookies,
+                f"cookies={dict(client.cookies)}",
+            ),
+            (
+                "202 body has no version/updated_at",
+                not {"version", "updated_at"} & response.json().keys(),
+                f"body={response.json()}",
+            ),
+        ]
+        await asyncio.sleep(0.1)
+        own = await client.get("/users/6")
+        results.append((
+            "writer reads its deferred write after the flush",
+            own.json()["full_name"] == "Deferred",
+            f"full_name={own.json()['full_name']!r}",
+        ))
+    return results
+
+
+async def check_least_latency(settings: Settings) -> list[tuple[str, bool, str]]:
+    app = create_app(replace(settings, replica_policy="least_latency"))
+    async with AsyncTestClient(app) as client:
+        slow = app.state.replicas.engines[0]
+
+        @event.listens_for(slow, "before_cursor_execute")
+        def delay(conn, cursor, statement, parameters, context, executemany):
+            time.sleep(0.005)
+
+        for user_id in range(1, 65):
+            response = await client.get(f"/users/{user_id % USERS + 1}")
+            assert response.status_code == 200, response.text
+        picks = app.state.replicas.picks
+        latency = app.state.replicas.stats()
+    return [(
+        "least_latency prefers the fast replica",
+        picks[1] > 3 * picks[0],
+        f"picks={picks} latency_ms=({latency['replica0_latency_ms']}, {latency['replica1_latency_ms']})",
+    )]
+
+
+async def main() -> int:
+    if os.getenv("PRIMARY_URL"):
+        primary, replicas = os.environ["PRIMARY_URL"], os.environ["REPLICA_URLS"].split(",")
+    else:
+        primary, replicas = sqlite_setup()
+    # Кэш и загрузчик выключены: считаем только маршрутизацию запросов (с ними — check_cached_reads)
+    settings = Settings(
+        database_url=primary,
+        database_replica_urls=tuple(replicas),
+        user_cache_size=0,
+        user_loader_max_batch=0,
+    )
+    results = await check_round_robin(settings)
+    results += await check_cached_reads(settings)
+    results += await check_deferred_writes(settings)
+    results += await check_least_latency(settings)
+    return report(results)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
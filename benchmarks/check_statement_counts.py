@@ -0,0 +1,57 @@
+"""Assert that every single-user write is exactly one SQL statement.
+
+Counts statements reaching the DBAPI cursor (before_cursor_execute) for
+create/update/delete and exits non-zero if any of them issues more than one.
+
+Usage: python -m benchmarks.check_statement_counts
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.models.user import Base
+from app.query_guard import QueryCounter
+from app.repositories.user_repository import UserRepository
+from app.schemas.user_schema import UserCreate, UserUpdate
+
+
+async def main() -> int:
+    path = os.path.join(tempfile.mkdtemp(), "check.sqlite3")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    repo = UserRepository()
+    failed = False
+
+    async def check(name: str, operation) -> None:
+        nonlocal failed
+        with QueryCounter(engine) as counter:
+            async with session_factory() as session:
+                await operation(session)
+        ok = counter.count == 1
+        failed = failed or not ok
+        print(f"{'OK ' if ok else 'FAIL'} {name}: {counter.count} statement(s)")
+        for statement in counter.statements:
+            print("     ", " ".join(statement.split()))
+
+    created = {}
+
+    async def create(session):
+        created["user"] = await repo.create(session, UserCreate(username="alice", email="alice@example.com"))
+
+    await check("create", create)
+    user_id = created["user"].id
+    await check("update", lambda session: repo.update(session, user_id, UserUpdate(full_name="Alice")))
+    await check("delete", lambda session: repo.delete(session, user_id))
+
+    await engine.dispose()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,208 @@
+"""Asyncio load generator for the users API.
+
+Replaces the one-request-at-a-time crud_examples scripts. Runs a weighted
+GET/POST/PUT/DELETE mix with N concurrent workers for a fixed duration and
+prints RPS and p50/p95/p99 latency per endpoint as JSON.
+
+Against a running server:
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8000 -c 32 -d 30
+
+In-process (ASGI transport, fresh SQLite file unless DATABASE_URL is set):
+    python -m benchmarks.load_test -c 32 -d 10 --mix get=70,list=10,post=10,put=5,delete=5
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+import httpx
+
+DEFAULT_MIX = "get=70,list=10,post=10,put=5,delete=5"
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def record(self, name: str, started: float, status: int | None) -> None:
+        self.latencies[name].append(time.perf_counter() - started)
+        if status is None or status >= 500:
+            self.errors[name] += 1
+        if status is not None:
+            self.statuses[name][status] += 1
+
+    def report(self, elapsed: float) -> dict:
+        def summary(samples: list[float]) -> dict:
+            cuts = statistics.quantiles(samples, n=100) if len(samples) > 1 else samples * 99
+            return {
+                "requests": len(samples),
+                "rps": round(len(samples) / elapsed, 1),
+                "p50_ms": round(cuts[49] * 1000, 3),
+                "p95_ms": round(cuts[94] * 1000, 3),
+                "p99_ms": round(cuts[98] * 1000, 3),
+            }
+
+        endpoints = {}
+        for name, samples in sorted(self.latencies.items()):
+            endpoints[name] = {
+                **summary(samples),
+                "errors": self.errors[name],
+                "status_codes": dict(sorted(self.statuses[name].items())),
+            }
+        every = list(itertools.chain.from_iterable(self.latencies.values()))
+        return {"elapsed_s": round(elapsed, 3), "total": summary(every) if every else {}, "endpoints": endpoints}
+
+
+class Workload:
+    """The GET/POST/PUT/DELETE operations and the pool of known user IDs"""
+
+    def __init__(self, client: httpx.AsyncClient, stats: Stats, rnd: random.Random):
+        self.client = client
+        self.stats = stats
+        self.rnd = rnd
+        self.user_ids: list[int] = []
+        self.counter = itertools.count()
+
+    async def _request(self, name: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.stats.record(name, started, None)
+            return None
+        self.stats.record(name, started, response.status_code)
+        return response
+
+    def _payload(self) -> dict:
+        n = next(self.counter)
+        tag = f"{os.getpid()}_{n}_{self.rnd.getrandbits(32):x}"
+        return {"username": f"load_{tag}", "email": f"load_{tag}@example.com", "full_name": f"Load User {n}"}
+
+    async def seed(self, count: int) -> None:
+        for start in range(0, count, 500):
+            batch = [self._payload() for _ in range(min(500, count - start))]
+            response = await self.client.post("/users/bulk", json=batch)
+            response.raise_for_status()
+            self.user_ids += [user["id"] for user in response.json()["items"]]
+        if not self.user_ids:
+            response = await self.client.get("/users", params={"count": 1000})
+            self.user_ids = [user["id"] for user in response.json()]
+
+    def _pick_id(self) -> int:
+        return self.rnd.choice(self.user_ids) if self.user_ids else 1
+
+    async def get(self) -> None:
+        await self._request("GET /users/{id}", "GET", f"/users/{self._pick_id()}")
+
+    async def list(self) -> None:
+        await self._request("GET /users", "GET", "/users", params={"count": 50, "page": self.rnd.randint(1, 20)})
+
+    async def post(self) -> None:
+        response = await self._request("POST /users", "POST", "/users", json=self._payload())
+        if response is not None and response.status_code == 201:
+            self.user_ids.append(response.json()["id"])
+
+    async def put(self) -> None:
+        await self._request(
+            "PUT /users/{id}", "PUT", f"/users/{self._pick_id()}", json={"full_name": f"Updated {next(self.counter)}"}
+        )
+
+    async def delete(self) -> None:
+        if len(self.user_ids) < 2:
+            return await self.post()
+        user_id = self.user_ids.pop(self.rnd.randrange(len(self.user_ids)))
+        await self._request("DELETE /users/{id}", "DELETE", f"/users/{user_id}")
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("get", "list", "post", "put", "delete"):
+            raise argparse.ArgumentTypeError(f"Unknown operation in mix: {name}")
+        weights[name] = int(weight)
+    return weights
+
+
+@asynccontextmanager
+async def make_client(base_url: str | None):
+    if base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            yield client
+        return
+
+    # In-process: свежая SQLite-база, если DATABASE_URL не задан
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "load.sqlite3")
+    from litestar.testing import AsyncTestClient
+    from app.main import app
+    from app.models.user import Base
+
+    async with AsyncTestClient(app, timeout=30) as client:
+        async with app.state.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        yield client
+
+
+async def run(args: argparse.Namespace) -> dict:
+    weights = parse_mix(args.mix)
+    operations, op_weights = zip(*weights.items())
+    stats = Stats()
+    rnd = random.Random(args.seed)
+
+    async with make_client(args.base_url) as client:
+        workload = Workload(client, stats, rnd)
+        await workload.seed(args.seed_users)
+
+        deadline = time.perf_counter() + args.duration
+
+        async def worker() -> None:
+            while time.perf_counter() < deadline:
+                operation = rnd.choices(operations, op_weights)[0]
+                await getattr(workload, operation)()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    report = stats.report(elapsed)
+    report["config"] = {
+        "target": args.base_url or "in-process",
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "mix": weights,
+    }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="server to load; omit to run the app in-process")
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--seed-users", type=int, default=1000, help="users created via /users/bulk before the run")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument("-o", "--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,37 +1,32 @@
 import asyncio
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from app.models.user import Base
 
-# Database configuration
-DATABASE_URL = "sqlite+aiosqlite:///mydb.sqlite3"
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import select
+
+from app.database import create_async_engine_from_settings
+from app.models.user import User
+from app.replicas import make_session_factory
+from app.settings import get_settings
+
 
 async def init_db():
-    # Create engine
-    engine = create_async_engine(DATABASE_URL, echo=True)
-    
-    # Create all tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
-    
+    # Схему ведёт только Alembic: upgrade head вместо drop_all/create_all,
+    # существующие данные не трогаем. env.py сам запускает event loop — отдельный поток
+    await asyncio.to_thread(command.upgrade, Config("alembic.ini"), "head")
+
+    engine = create_async_engine_from_settings(get_settings())
+    session_factory = make_session_factory(engine)
+
     # Create a test user
-    async_session = sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
-    )
-    
-    async with async_session() as session:
-        from app.models.user import User
-        test_user = User(
-            username="test_user",
-            email="test@example.com",
-            full_name="Test User"
-        )
-        session.add(test_user)
-        await session.commit()
+    async with session_factory() as session:
+        exists = await session.scalar(select(User.id).where(User.username == "test_user"))
+        if exists is None:
+            session.add(User(username="test_user", email="test@example.com", full_name="Test User"))
+            await session.commit()
 
     await engine.dispose()
 
 if __name__ == "__main__":
     asyncio.run(init_db())
-    print("Database initialized successfully!")
\ No newline at end of file
+    print("Database initialized successfully!")
@@ -1,13 +1,27 @@
+import asyncio
+from itertools import groupby
+
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from db import SessionLocal
-from models import User
 
-def show_users_with_addresses():
-    with SessionLocal() as session:
-        stmt = select(User).options(selectinload(User.addresses))
-        for user in session.execute(stmt).scalars():
-            print(user.name, [a.city for a in user.addresses])
+from app.database import create_async_engine_from_settings
+from app.settings import get_settings
+from models import Address, User
+
+async def show_users_with_addresses():
+    engine = create_async_engine_from_settings(get_settings())
+    try:
+        async with engine.connect() as conn:
+            stmt = (
+                select(User.id, User.username, Address.city)
+                .outerjoin(Address, Address.user_id == User.id)
+                .order_by(User.id, Address.id)
+            )
+            rows = (await conn.execute(stmt)).all()
+    finally:
+        await engine.dispose()
+
+    for (_, username), group in groupby(rows, key=lambda row: (row.id, row.username)):
+        print(username, [row.city for row in group if row.city is not None])
 
 if __name__ == "__main__":
-    show_users_with_addresses()
\ No newline at end of file
+    asyncio.run(show_users_with_addresses())
@@ -1,15 +1,28 @@
+import asyncio
+import os
+from dataclasses import replace
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config
 from sqlalchemy import pool
+from sqlalchemy.engine import Connection
 
 from alembic import context
+from app.database import create_async_engine_from_settings
+from app.settings import get_settings
 from models import Base
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 
 config = context.config
 
+# DATABASE_URL из окружения имеет приоритет над sqlalchemy.url в alembic.ini;
+# миграции идут через тот же async-движок (и те же PRAGMA), что и приложение
+settings = get_settings()
+if "DATABASE_URL" in os.environ:
+    config.set_main_option("sqlalchemy.url", settings.database_url)
+else:
+    settings = replace(settings, database_url=config.get_main_option("sqlalchemy.url"))
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
@@ -21,6 +34,11 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    # users_fts* создаёт DDL поиска (app/search.py), в metadata их нет
+    return not (type_ == "table" and name.startswith("users_fts"))
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -43,6 +61,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -51,26 +70,26 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
-def run_migrations_online() -> None:
-    """Run migrations in 'online' mode.
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
 
-    In this scenario we need to create an Engine
-    and associate a connection with the context.
+    with context.begin_transaction():
+        context.run_migrations()
 
-    """
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
 
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
+async def run_async_migrations() -> None:
+    """Run migrations in 'online' mode over the application's async engine."""
+    connectable = create_async_engine_from_settings(settings, poolclass=pool.NullPool)
+
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
 
-        with context.begin_transaction():
-            context.run_migrations()
+    await connectable.dispose()
+
+
+def run_migrations_online() -> None:
+    """Run migrations in 'online' mode."""
+    asyncio.run(run_async_migrations())
 
 
 if context.is_offline_mode():
@@ -0,0 +1,59 @@
+"""order totals and user order stats
+
+Revision ID: 3b8d1f0c2a71
+Revises: e7cf10c8089b
+Create Date: 2026-10-18 10:12:04.318215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8d1f0c2a71'
+down_revision: Union[str, Sequence[str], None] = 'e7cf10c8089b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.add_column(sa.Column('total_cents', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_orders_total_cents'), ['total_cents'], unique=False)
+
+    op.create_table(
+        'user_order_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('order_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total_spent_cents', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Заполняем агрегаты по уже существующим заказам
+    op.execute(
+        """
+        UPDATE orders SET total_cents = COALESCE((
+            SELECT SUM(p.price_cents)
+            FROM order_products op JOIN products p ON p.id = op.product_id
+            WHERE op.order_id = orders.id
+        ), 0)
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO user_order_stats (user_id, order_count, total_spent_cents)
+        SELECT user_id, COUNT(*), SUM(total_cents) FROM orders GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_order_stats')
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_orders_total_cents'))
+        batch_op.drop_column('total_cents')
@@ -0,0 +1,79 @@
+"""user search index: FTS5 trigram on SQLite, pg_trgm on PostgreSQL
+
+Revision ID: 5f1a9e3c7d20
+Revises: a7e3c9d1f402
+Create Date: 2026-10-18 12:20:31.604417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f1a9e3c7d20'
+down_revision: Union[str, Sequence[str], None] = 'a7e3c9d1f402'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            """
+            CREATE INDEX ix_users_search_trgm ON users
+            USING gin ((username || ' ' || coalesce(full_name, '') || ' ' || email) gin_trgm_ops)
+            """
+        )
+        return
+
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE users_fts USING fts5(
+            username, full_name, email,
+            content='users', content_rowid='id', tokenize='trigram'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER users_fts_ai AFTER INSERT ON users BEGIN
+            INSERT INTO users_fts (rowid, username, full_name, email)
+            VALUES (new.id, new.username, new.full_name, new.email);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER users_fts_ad AFTER DELETE ON users BEGIN
+            INSERT INTO users_fts (users_fts, rowid, username, full_name, email)
+            VALUES ('delete', old.id, old.username, old.full_name, old.email);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER users_fts_au AFTER UPDATE OF username, full_name, email ON users BEGIN
+            INSERT INTO users_fts (users_fts, rowid, username, full_name, email)
+            VALUES ('delete', old.id, old.username, old.full_name, old.email);
+            INSERT INTO users_fts (rowid, username, full_name, email)
+            VALUES (new.id, new.username, new.full_name, new.email);
+        END
+        """
+    )
+    # Индексируем уже существующих пользователей
+    op.execute("INSERT INTO users_fts (users_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_users_search_trgm")
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS users_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS users_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS users_fts_ai")
+    op.execute("DROP TABLE IF EXISTS users_fts")
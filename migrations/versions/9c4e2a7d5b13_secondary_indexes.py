@@ -0,0 +1,35 @@
+"""secondary indexes on foreign keys and orders.created_at
+
+Revision ID: 9c4e2a7d5b13
+Revises: 3b8d1f0c2a71
+Create Date: 2026-10-18 11:02:47.915530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e2a7d5b13'
+down_revision: Union[str, Sequence[str], None] = '3b8d1f0c2a71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_addresses_user_id'), 'addresses', ['user_id'], unique=False)
+    op.create_index(op.f('ix_orders_user_id'), 'orders', ['user_id'], unique=False)
+    op.create_index(op.f('ix_orders_shipping_address_id'), 'orders', ['shipping_address_id'], unique=False)
+    op.create_index(op.f('ix_orders_created_at'), 'orders', ['created_at'], unique=False)
+    op.create_index(op.f('ix_order_products_product_id'), 'order_products', ['product_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_order_products_product_id'), table_name='order_products')
+    op.drop_index(op.f('ix_orders_created_at'), table_name='orders')
+    op.drop_index(op.f('ix_orders_shipping_address_id'), table_name='orders')
+    op.drop_index(op.f('ix_orders_user_id'), table_name='orders')
+    op.drop_index(op.f('ix_addresses_user_id'), table_name='addresses')
@@ -0,0 +1,114 @@
+"""unify users schema: name/description -> username/full_name
+
+Revision ID: a7e3c9d1f402
+Revises: 9c4e2a7d5b13
+Create Date: 2026-10-18 16:05:12.318204
+
+The initial revision created users from the scripts' model (name, email,
+description), while the API's model has username/full_name. Databases made
+by init_db.py already have the API's shape and only get stamped through
+this revision; older ones are converted online:
+
+  1. expand: add nullable username/full_name (no table rewrite);
+  2. backfill in batches of BATCH_SIZE, each in its own short transaction,
+     so writers using the old columns are not blocked;
+  3. contract: fill rows written meanwhile, make username NOT NULL and
+     unique, drop name. Only this step locks the table (on SQLite it is a
+     table rebuild).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e3c9d1f402'
+down_revision: Union[str, Sequence[str], None] = '9c4e2a7d5b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+USERNAME_LENGTH = 50
+
+users = sa.table(
+    'users',
+    sa.column('id', sa.Integer),
+    sa.column('name', sa.String),
+    sa.column('email', sa.String),
+    sa.column('username', sa.String),
+    sa.column('full_name', sa.String),
+)
+
+
+def _user_columns() -> set[str]:
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns('users')}
+
+
+def derive_username(email: str, user_id: int) -> str:
+    """Local part of the email plus "_<id>": unique because the id is"""
+    suffix = f"_{user_id}"
+    return email.split('@', 1)[0][:USERNAME_LENGTH - len(suffix)] + suffix
+
+
+def backfill_usernames(bind, batch_size: int = BATCH_SIZE) -> int:
+    """Fill username/full_name for rows that lack them, batch by batch in id order"""
+    filled = 0
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(users.c.id, users.c.email)
+            .where(users.c.username.is_(None), users.c.id > last_id)
+            .order_by(users.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return filled
+        # Один UPDATE на пачку: в autocommit это одна короткая транзакция
+        bind.execute(
+            users.update()
+            .where(users.c.id.in_([row.id for row in rows]))
+            .values(
+                username=sa.case({row.id: derive_username(row.email, row.id) for row in rows}, value=users.c.id),
+                full_name=users.c.name,
+            )
+        )
+        filled += len(rows)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if 'username' in _user_columns():
+        return
+
+    op.add_column('users', sa.Column('username', sa.String(length=USERNAME_LENGTH), nullable=True))
+    op.add_column('users', sa.Column('full_name', sa.String(length=100), nullable=True))
+
+    dialect = op.get_bind().dialect.name
+    with op.get_context().autocommit_block():
+        backfill_usernames(op.get_bind())
+        if dialect == 'postgresql':
+            op.execute('CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_users_username ON users (username)')
+
+    # Строки, записанные старым кодом во время backfill
+    backfill_usernames(op.get_bind())
+    if dialect == 'postgresql':
+        op.execute('ALTER TABLE users ADD CONSTRAINT uq_users_username UNIQUE USING INDEX uq_users_username')
+        op.alter_column('users', 'username', existing_type=sa.String(length=USERNAME_LENGTH), nullable=False)
+        op.drop_column('users', 'name')
+    else:
+        with op.batch_alter_table('users') as batch_op:
+            batch_op.alter_column('username', existing_type=sa.String(length=USERNAME_LENGTH), nullable=False)
+            batch_op.create_unique_constraint('uq_users_username', ['username'])
+            batch_op.drop_column('name')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('users', sa.Column('name', sa.String(length=100), nullable=True))
+    op.execute(users.update().values(name=sa.func.coalesce(users.c.full_name, users.c.username)))
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column('name', existing_type=sa.String(length=100), nullable=False)
+        batch_op.drop_column('full_name')
+        batch_op.drop_column('username')
@@ -0,0 +1,74 @@
+"""users: keep description, email up to 255 characters
+
+Revision ID: c5b8e2f4a613
+Revises: d81f3b6a2c45
+Create Date: 2026-10-18 16:12:40.551093
+
+Databases converted by a7e3c9d1f402 already have both; ones created by the
+old init_db.py (create_all over the API's model) get them here, so every
+database ends up with the single model in app/models/user.py.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5b8e2f4a613'
+down_revision: Union[str, Sequence[str], None] = 'd81f3b6a2c45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Пересоздание таблицы users в batch-режиме SQLite удаляет её триггеры — ставим заново
+_SQLITE_SEARCH_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts (rowid, username, full_name, email)
+        VALUES (new.id, new.username, new.full_name, new.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts (users_fts, rowid, username, full_name, email)
+        VALUES ('delete', old.id, old.username, old.full_name, old.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF username, full_name, email ON users BEGIN
+        INSERT INTO users_fts (users_fts, rowid, username, full_name, email)
+        VALUES ('delete', old.id, old.username, old.full_name, old.email);
+        INSERT INTO users_fts (rowid, username, full_name, email)
+        VALUES (new.id, new.username, new.full_name, new.email);
+    END
+    """,
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = {column['name']: column for column in sa.inspect(op.get_bind()).get_columns('users')}
+    # ADD COLUMN без DEFAULT не переписывает таблицу ни в SQLite, ни в PostgreSQL
+    if 'description' not in columns:
+        op.add_column('users', sa.Column('description', sa.String(length=500), nullable=True))
+
+    email_length = getattr(columns['email']['type'], 'length', None)
+    if email_length is None or email_length >= 255:
+        return
+    if op.get_bind().dialect.name == 'sqlite':
+        # Длину VARCHAR SQLite не проверяет, но объявленный тип должен совпадать с моделью
+        with op.batch_alter_table('users') as batch_op:
+            batch_op.alter_column('email', existing_type=sa.String(length=email_length), type_=sa.String(length=255))
+        for statement in _SQLITE_SEARCH_TRIGGERS:
+            op.execute(statement)
+    else:
+        # В PostgreSQL расширение varchar меняет только метаданные, таблица не переписывается
+        op.alter_column(
+            'users', 'email', existing_type=sa.String(length=email_length), type_=sa.String(length=255)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Обе колонки есть и в схеме до a7e3c9d1f402, откатывать нечего
+    pass
@@ -0,0 +1,65 @@
+"""user version and updated_at
+
+Revision ID: d81f3b6a2c45
+Revises: b2d6c4e8a951
+Create Date: 2026-10-18 14:36:52.104883
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f3b6a2c45'
+down_revision: Union[str, Sequence[str], None] = 'b2d6c4e8a951'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Пересоздание таблицы users в batch-режиме SQLite удаляет её триггеры — ставим заново
+_SQLITE_SEARCH_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts (rowid, username, full_name, email)
+        VALUES (new.id, new.username, new.full_name, new.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts (users_fts, rowid, username, full_name, email)
+        VALUES ('delete', old.id, old.username, old.full_name, old.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF username, full_name, email ON users BEGIN
+        INSERT INTO users_fts (users_fts, rowid, username, full_name, email)
+        VALUES ('delete', old.id, old.username, old.full_name, old.email);
+        INSERT INTO users_fts (rowid, username, full_name, email)
+        VALUES (new.id, new.username, new.full_name, new.email);
+    END
+    """,
+)
+
+
+def _restore_search_triggers() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in _SQLITE_SEARCH_TRIGGERS:
+            op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite не умеет ADD COLUMN с непостоянным DEFAULT (CURRENT_TIMESTAMP) — batch пересоздаёт таблицу
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False))
+    _restore_search_triggers()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('version')
+    _restore_search_triggers()
@@ -1,22 +1,33 @@
-# seed.py
-from db import SessionLocal
-from models import User, Address
-from models import Product, Order, User
-
-def seed():
-    with SessionLocal() as session:
-        users = []
-        for i in range(1, 6):
-            u = User(name=f"User {i}", email=f"user{i}@example.com")
-            u.addresses = [
-                Address(city="CityA", street=f"A Street {i}"),
-                Address(city="CityB", street=f"B Street {i}")
-            ]
-            users.append(u)
+import asyncio
+
+from sqlalchemy import select
+
+from app.database import create_async_engine_from_settings
+from app.replicas import make_session_factory
+from app.repositories.order_repository import OrderRepository
+from app.settings import get_settings
+from models import Address, Product, User
+
+# Тот же async-движок и та же схема (app/models), что и у API
+
+
+async def seed(session_factory):
+    async with session_factory() as session:
+        users = [
+            User(username=f"user{i}", email=f"user{i}@example.com", full_name=f"User {i}")
+            for i in range(1, 6)
+        ]
         session.add_all(users)
-        session.commit()
-def seed_products_and_orders():
-    with SessionLocal() as session:
+        await session.flush()
+        session.add_all(
+            Address(user_id=user.id, city=city, street=f"{city[-1]} Street {i}")
+            for i, user in enumerate(users, start=1)
+            for city in ("CityA", "CityB")
+        )
+        await session.commit()
+
+async def seed_products_and_orders(session_factory):
+    async with session_factory() as session:
         products = [
             Product(title="Prod A", price_cents=1000),
             Product(title="Prod B", price_cents=1500),
@@ -25,14 +36,18 @@ def seed_products_and_orders():
             Product(title="Prod E", price_cents=3000),
         ]
         session.add_all(products)
-        session.commit()
+        await session.commit()
+
+        address = (await session.execute(select(Address).order_by(Address.id).limit(1))).scalar_one()
+        # Через репозиторий: сумма заказа и user_order_stats считаются так же, как в API
+        await OrderRepository().create(session, address.user_id, address.id, [p.id for p in products[:2]])
 
-        user = session.query(User).first()
-        addr = user.addresses[0]
-        prods = session.query(Product).all()
+async def main():
+    engine = create_async_engine_from_settings(get_settings())
+    try:
+        await seed(make_session_factory(engine))
+    finally:
+        await engine.dispose()
 
-        order = Order(user=user, shipping_address=addr, products=prods[:2])
-        session.add(order)
-        session.commit()
 if __name__ == "__main__":
-    seed()
\ No newline at end of file
+    asyncio.run(main())